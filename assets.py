@@ -0,0 +1,135 @@
+import os
+import time
+
+import pygame
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ======================================
+# ASSET REGISTRY
+# ======================================
+class AssetRegistry:
+    """Decodes every image, sound and font once and hands out shared objects."""
+
+    def __init__(self, root=ASSET_DIR):
+        self.root = root
+        self.cache = {}
+        self.stats = {}  # key -> (kind, load_ms, bytes, loaded_from_disk)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def _remember(self, key, kind, value, start, nbytes, ok):
+        self.cache[key] = value
+        self.stats[key] = (kind, (time.perf_counter() - start) * 1000, nbytes, ok)
+        return value
+
+    # ---------- images ----------
+    def image(self, name, alpha=True, size=None, fallback=None):
+        """Shared surface for an image file; fallback() builds one if loading fails."""
+        key = ("image", name, alpha, size)
+        if key in self.cache:
+            return self.cache[key]
+
+        start = time.perf_counter()
+        ok = True
+        try:
+            surf = pygame.image.load(self.path(name))
+            # convert() needs a display mode; headless callers keep the raw surface
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert_alpha() if alpha else surf.convert()
+            if size is not None:
+                surf = pygame.transform.scale(surf, size)
+        except (pygame.error, OSError):
+            if fallback is None:
+                raise
+            surf = fallback()
+            ok = False
+
+        nbytes = surf.get_pitch() * surf.get_height()
+        return self._remember(key, "image", surf, start, nbytes, ok)
+
+    def rotations(self, name, step, fallback=None):
+        """Shared RotationFrames for an image, pre-rotated in `step` degree increments."""
+        key = ("rotations", name, step)
+        if key in self.cache:
+            return self.cache[key]
+
+        base = self.image(name, fallback=fallback)
+        start = time.perf_counter()
+        frames = RotationFrames(base, step)
+        nbytes = sum(img.get_pitch() * img.get_height() for img in frames.images)
+        return self._remember(key, "image", frames, start, nbytes, True)
+
+    # ---------- sounds ----------
+    def sound(self, name):
+        """Shared Sound object, or None when the mixer or the file is unavailable."""
+        key = ("sound", name)
+        if key in self.cache:
+            return self.cache[key]
+
+        start = time.perf_counter()
+        snd = None
+        nbytes = 0
+        mixer = pygame.mixer.get_init()
+        if mixer:
+            try:
+                snd = pygame.mixer.Sound(self.path(name))
+                freq, size, channels = mixer
+                nbytes = int(snd.get_length() * freq) * (abs(size) // 8) * channels
+            except (pygame.error, OSError):
+                snd = None
+        return self._remember(key, "sound", snd, start, nbytes, snd is not None)
+
+    # ---------- fonts ----------
+    def font(self, family, size, bold=False):
+        """Shared SysFont; resolving a family goes through fontconfig, so do it once."""
+        key = ("font", family, size, bold)
+        if key in self.cache:
+            return self.cache[key]
+
+        start = time.perf_counter()
+        f = pygame.font.SysFont(family, size, bold=bold)
+        return self._remember(key, "font", f, start, 0, True)
+
+    # ---------- diagnostics ----------
+    def report(self):
+        """Human readable load time / memory table, slowest first."""
+        lines = [f"{'asset':<34}{'kind':<7}{'load ms':>9}{'KB':>9}"]
+        total_ms = 0
+        total_bytes = 0
+        for key, (kind, ms, nbytes, ok) in sorted(self.stats.items(), key=lambda kv: -kv[1][1]):
+            label = " ".join(str(k) for k in key[1:] if k not in (None, True, False))
+            if not ok:
+                label += " (fallback)"
+            lines.append(f"{label:<34}{kind:<7}{ms:>9.2f}{nbytes / 1024:>9.1f}")
+            total_ms += ms
+            total_bytes += nbytes
+        lines.append(f"{'total':<41}{total_ms:>9.2f}{total_bytes / 1024:>9.1f}")
+        return "\n".join(lines)
+
+
+# ======================================
+# ROTATION CACHE
+# ======================================
+class RotationFrames:
+    """Rotated copies of one surface plus their rect offsets and collision masks."""
+
+    def __init__(self, surf, step):
+        self.step = step
+        self.images = []
+        self.offsets = []  # (dx, dy, w, h) of the rect relative to the sprite center
+        self.masks = []
+        for i in range(360 // step):
+            img = surf if i == 0 else pygame.transform.rotate(surf, i * step)
+            w, h = img.get_size()
+            self.images.append(img)
+            self.offsets.append((-(w // 2), -(h // 2), w, h))
+            self.masks.append(pygame.mask.from_surface(img))
+
+    def index(self, angle):
+        return (angle // self.step) % len(self.images)
+
+
+assets = AssetRegistry()
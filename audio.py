@@ -0,0 +1,181 @@
+import time
+
+import pygame
+
+from assets import assets
+
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512  # samples; ~12 ms at 44.1 kHz
+
+MUSIC_FILE = "sounds/music.ogg"
+
+# Mixer channels reserved per category, in channel order
+CHANNEL_BUDGET = {
+    "player": 2,  # player hits must never be starved by explosions
+    "sfx": 8,
+    "ui": 2,
+}
+
+# The same sound started more often than this in one frame is throttled
+MAX_SAME_PER_FRAME = 2
+
+# Sound bank: name -> (file, category)
+SOUND_BANK = {
+    "kill": ("boom.wav", "sfx"),
+    "hit": ("boom.wav", "player"),
+}
+
+
+# ======================================
+# AUDIO ENGINE
+# ======================================
+class AudioEngine:
+    """Owns the mixer: preloaded sounds, per-category channels and the music stream.
+
+    play() never opens a channel the category does not own. Identical sounds
+    past MAX_SAME_PER_FRAME in one frame are throttled; when a category has
+    no idle channel the oldest voice in it is stolen, unless that voice was
+    itself started this frame, in which case the new sound is dropped. Music is loaded once and
+    toggled with pause/unpause. SDL does not report device underruns, so the
+    closest thing counted is a music stream found stopped while it should be
+    playing (it is restarted).
+    """
+
+    def __init__(self, registry=assets, bank=SOUND_BANK, budget=CHANNEL_BUDGET):
+        self.registry = registry
+        self.bank_spec = bank
+        self.budget = budget
+        self.bank = {}
+        self.channels = {}
+        self.started = {}  # channel index -> start time, for stealing the oldest
+        self.frame_counts = {}
+        self.frame_start = time.perf_counter()
+        self.ready = False
+        self.sound_on = True
+        self.music_on = True
+        self.music_loaded = False
+        self.music_failed = False
+        self.music_playing = False
+        self.errors = []
+        self.stats_counts = dict.fromkeys(("played", "throttled", "stolen", "dropped", "underruns"), 0)
+
+    # ---------- setup ----------
+    def init(self):
+        """Open the mixer with an explicit buffer and channel layout, then preload the bank."""
+        try:
+            pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+        except pygame.error as e:
+            self.errors.append(f"mixer: {e}")
+            return False
+
+        total = sum(self.budget.values())
+        pygame.mixer.set_num_channels(total)
+        # Reserved channels are never picked by Sound.play(), only by us
+        pygame.mixer.set_reserved(total)
+        first = 0
+        for category, count in self.budget.items():
+            self.channels[category] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+
+        for name, (filename, category) in self.bank_spec.items():
+            snd = self.registry.sound(filename)
+            if snd is None:
+                self.errors.append(f"sound {filename}: not loaded")
+            self.bank[name] = (snd, category)
+        self.ready = True
+        return True
+
+    # ---------- effects ----------
+    def play(self, name):
+        if not (self.ready and self.sound_on):
+            return None
+        snd, category = self.bank.get(name, (None, None))
+        if snd is None:
+            return None
+
+        count = self.frame_counts.get(name, 0)
+        if count >= MAX_SAME_PER_FRAME:
+            self.stats_counts["throttled"] += 1
+            return None
+        self.frame_counts[name] = count + 1
+
+        channels = self.channels.get(category)
+        if not channels:
+            self.stats_counts["dropped"] += 1
+            return None
+        channel = None
+        for ch in channels:
+            if not ch.get_busy():
+                channel = ch
+                break
+        if channel is None:
+            channel = min(channels, key=lambda ch: self.started.get(id(ch), 0.0))
+            # Every voice started this frame: cutting one off for another would be inaudible churn
+            if self.started.get(id(channel), 0.0) >= self.frame_start:
+                self.stats_counts["dropped"] += 1
+                return None
+            self.stats_counts["stolen"] += 1
+        channel.play(snd)
+        self.started[id(channel)] = time.perf_counter()
+        self.stats_counts["played"] += 1
+        return channel
+
+    def end_frame(self):
+        """Start a new throttle window and check the music stream; call once per frame."""
+        self.frame_counts.clear()
+        self.frame_start = time.perf_counter()
+        if self.music_playing and not pygame.mixer.music.get_busy():
+            self.stats_counts["underruns"] += 1
+            self._start_music()
+
+    # ---------- music ----------
+    def _start_music(self):
+        try:
+            pygame.mixer.music.play(-1)
+        except pygame.error as e:
+            self.errors.append(f"music: {e}")
+            self.music_playing = False
+
+    def play_music(self):
+        """Start or resume the music stream; the file is only opened the first time."""
+        if not (self.ready and self.music_on) or self.music_failed:
+            return
+        if not self.music_loaded:
+            try:
+                pygame.mixer.music.load(self.registry.path(MUSIC_FILE))
+            except pygame.error as e:
+                # Reported once; toggling music again will not retry the disk
+                self.errors.append(f"music {MUSIC_FILE}: {e}")
+                self.music_failed = True
+                return
+            self.music_loaded = True
+            self.music_playing = True
+            self._start_music()
+        elif not self.music_playing:
+            pygame.mixer.music.unpause()
+            self.music_playing = True
+
+    def pause_music(self):
+        if self.music_playing:
+            pygame.mixer.music.pause()
+            self.music_playing = False
+
+    def set_music(self, on):
+        self.music_on = on
+        if on:
+            self.play_music()
+        else:
+            self.pause_music()
+
+    # ---------- diagnostics ----------
+    def stats(self):
+        return {
+            **self.stats_counts,
+            "channels": {c: len(chs) for c, chs in self.channels.items()},
+            "errors": list(self.errors),
+        }
+
+
+audio = AudioEngine()
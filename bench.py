@@ -0,0 +1,396 @@
+"""Frame-time benchmark: drives the game headless through fixed scenarios.
+
+    python bench.py --out before.json
+    python bench.py --baseline before.json --threshold 0.10
+
+Every scenario reports p50/p95/p99 per stage in milliseconds. With
+--baseline the run fails (exit code 1) when any stage's p95 regresses by
+more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import covidWarRemaster as game
+from spatial import SpatialHash, collide_groups
+from swarm import SwarmWorld, np
+from config import BASE_WIDTH, BASE_HEIGHT, FPS
+from render import SCALE_MODES, SCALE_NEAREST
+from world import World, Inputs, Cure, NO_INPUT, EVENT_KILL
+
+STAGES = ("update", "collide", "waves", "draw", "effects", "scale", "present", "frame")
+
+# World.step stage name -> benchmark stage
+WORLD_STAGES = {
+    "update": "update",
+    "collide_bullets": "collide",
+    "collide_player": "collide",
+    "waves": "waves",
+}
+
+# Stages faster than this are too noisy to fail a comparison on
+NOISE_FLOOR_MS = 0.05
+
+
+# ======================================
+# STAGE TIMER
+# ======================================
+class StageTimer:
+    def __init__(self):
+        self.samples = {s: [] for s in STAGES}
+        self.current = {}
+        self.last = 0.0
+        self.start = 0.0
+
+    def begin(self):
+        self.current = dict.fromkeys(STAGES, 0.0)
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        stage = WORLD_STAGES.get(name, name)
+        self.current[stage] += (now - self.last) * 1000
+        self.last = now
+
+    def end(self, keep=True):
+        self.current["frame"] = (time.perf_counter() - self.start) * 1000
+        if keep:
+            for s in STAGES:
+                self.samples[s].append(self.current[s])
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+def summarize(samples):
+    out = {}
+    for stage, values in samples.items():
+        v = sorted(values)
+        out[stage] = {
+            "p50": percentile(v, 50),
+            "p95": percentile(v, 95),
+            "p99": percentile(v, 99),
+            "mean": sum(v) / len(v) if v else 0.0,
+        }
+    return out
+
+
+# ======================================
+# SCENARIOS
+# ======================================
+class Scenario:
+    """Sets up a world and supplies per-tick input; refill() runs untimed."""
+
+    name = ""
+    menu = False
+
+    def available(self):
+        return True
+
+    def make_world(self, seed=None):
+        return World(seed)
+
+    def setup(self, world):
+        world.player.life = 10 ** 9  # never reach game over mid-run
+
+    def inputs(self, world, tick):
+        return NO_INPUT
+
+    def refill(self, world, tick):
+        pass
+
+
+class IdleMenu(Scenario):
+    name = "idle_menu"
+    menu = True
+
+
+class WaveOne(Scenario):
+    name = "wave1_6_enemies"
+
+
+class WaveFiveFire(Scenario):
+    name = "wave5_continuous_fire"
+
+    def setup(self, world):
+        super().setup(world)
+        # Jump to the last wave's start with every earlier wave already spawned
+        world.tick = int(world.waves.waves[-1].start * FPS)
+        world.run_waves()
+        world.events = []
+
+    def inputs(self, world, tick):
+        # Sweep left and right while firing every third tick
+        speedx = 6 if (tick // 90) % 2 else -6
+        return Inputs(speedx, 1 if tick % 3 == 0 else 0)
+
+
+class Stress(Scenario):
+    name = "stress_500"
+    enemies = 500
+    bullets = 500
+    effects = 100
+
+    def setup(self, world):
+        super().setup(world)
+        for i in range(self.enemies - len(world.covids)):
+            world.spawn_covid()
+        if game.particles.budget < 2 * self.effects:
+            game.particles.set_budget(2 * self.effects)
+
+    def refill(self, world, tick):
+        for i in range(self.bullets - len(world.cures)):
+            b = world.cure_pool.acquire()
+            b.reset(random.randrange(BASE_WIDTH), random.randrange(40, BASE_HEIGHT))
+            world.allsprites.add(b)
+            world.cures.add(b)
+        # Half rings, half score labels
+        while len(game.particles) < 2 * self.effects:
+            pos = (random.randrange(BASE_WIDTH), random.randrange(BASE_HEIGHT))
+            if len(game.particles) % 2:
+                game.particles.spawn_score(pos, 100)
+            else:
+                game.particles.spawn_ring(pos)
+
+
+class Swarm(Scenario):
+    name = "swarm_10k"
+    enemies = 10000
+
+    def available(self):
+        return np is not None
+
+    def make_world(self, seed=None):
+        return SwarmWorld(self.enemies, seed=seed)
+
+    def setup(self, world):
+        super().setup(world)
+        # Let the swarm fill the screen before measuring
+        for i in range(120):
+            world.step()
+
+    def inputs(self, world, tick):
+        speedx = 6 if (tick // 90) % 2 else -6
+        return Inputs(speedx, 1 if tick % 3 == 0 else 0)
+
+
+SCENARIOS = [IdleMenu(), WaveOne(), WaveFiveFire(), Stress(), Swarm()]
+
+
+# ======================================
+# RUNNER
+# ======================================
+def run_scenario(scn, frames, warmup, seed):
+    # setup() may resize the shared effects budget; later scenarios must see the usual one
+    budget, cap = game.particles.budget, game.particles.cap
+    try:
+        return _run_scenario(scn, frames, warmup, seed)
+    finally:
+        game.particles.set_budget(budget)
+        game.particles.set_cap(cap)
+
+
+def _run_scenario(scn, frames, warmup, seed):
+    random.seed(seed)
+    game.world = world = scn.make_world(seed)
+    game.particles.clear()
+    game.shake_timer = 0
+    game.game_state = game.STATE_MENU if scn.menu else game.STATE_PLAYING
+    game.screen_cache.invalidate()
+    scn.setup(world)
+
+    timer = StageTimer()
+    surf = game.game_surface
+    for tick in range(warmup + frames):
+        scn.refill(world, tick)
+        inputs = scn.inputs(world, tick)
+
+        timer.begin()
+        if scn.menu:
+            # Same path as the game: unchanged menu frames are neither scaled nor presented
+            changed = game.draw_static_screen()
+            timer.mark("draw")
+            if not changed:
+                timer.end(keep=tick >= warmup)
+                continue
+        else:
+            world.step(inputs, mark=timer.mark)
+            for kind, data in world.events:
+                if kind == EVENT_KILL:
+                    game.particles.spawn_ring(data)
+                    game.particles.spawn_score(data, 100)
+            surf.fill((0, 0, 0))
+            surf.blit(game.bg, (0, 0))
+            world.allsprites.draw(surf)
+            timer.mark("draw")
+
+            game.particles.update()
+            game.particles.draw(surf)
+            timer.mark("effects")
+
+        game.draw_centered()
+        timer.mark("scale")
+        pygame.display.update()
+        timer.mark("present")
+        timer.end(keep=tick >= warmup)
+
+    return summarize(timer.samples)
+
+
+# ======================================
+# BROADPHASE SCALING
+# ======================================
+COLLIDE_COUNTS = (250, 500, 1000, 2000, 4000, 8000)
+
+
+def collide_scaling(counts=COLLIDE_COUNTS, repeats=5, seed=1):
+    """groupcollide vs the spatial hash for n enemies against n bullets at constant density."""
+    random.seed(seed)
+    grid = SpatialHash()
+    rows = {}
+    for n in counts:
+        world = World()
+        for i in range(n - len(world.covids)):
+            world.spawn_covid()
+        # Keep the density of the 500 entity stress test: the field grows with n,
+        # otherwise the number of real overlaps alone would grow quadratically
+        side = (n / 500) ** 0.5
+        field_w, field_h = int(BASE_WIDTH * side), int(BASE_HEIGHT * side)
+        for c in world.covids:
+            c.rect.topleft = (random.randrange(field_w - 64), random.randrange(field_h - 64))
+        for i in range(n):
+            b = Cure(random.randrange(field_w), random.randrange(40, field_h))
+            world.cures.add(b)
+
+        timings = {}
+        for name in ("groupcollide", "spatial_hash"):
+            best = None
+            for r in range(repeats):
+                t0 = time.perf_counter()
+                if name == "groupcollide":
+                    hits = pygame.sprite.groupcollide(world.covids, world.cures, False, False)
+                else:
+                    hits = collide_groups(grid, world.covids, world.cures, False, False)
+                ms = (time.perf_counter() - t0) * 1000
+                best = ms if best is None else min(best, ms)
+            timings[name] = best
+            timings[name + "_hits"] = len(hits)
+        rows[str(n)] = timings
+    return rows
+
+
+def print_collide_scaling(rows):
+    print(f"\n{'n enemies + n bullets':<24}{'groupcollide ms':>16}{'spatial hash ms':>17}{'speedup':>9}")
+    for n, t in rows.items():
+        speedup = t["groupcollide"] / max(t["spatial_hash"], 1e-9)
+        print(f"{n:<24}{t['groupcollide']:>16.2f}{t['spatial_hash']:>17.2f}{speedup:>8.1f}x")
+
+
+def compare(results, baseline, threshold):
+    """List of human readable regressions against a previous run."""
+    failures = []
+    for name, stages in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for stage, stats in stages.items():
+            before = old.get(stage, {}).get("p95")
+            after = stats["p95"]
+            if before is None or max(before, after) < NOISE_FLOOR_MS:
+                continue
+            if after > before * (1 + threshold):
+                failures.append(f"{name}/{stage}: p95 {before:.3f} -> {after:.3f} ms "
+                                f"(+{(after / max(before, 1e-9) - 1) * 100:.0f}%)")
+    return failures
+
+
+def print_table(results):
+    for name, stages in results["scenarios"].items():
+        print(f"\n{name}")
+        print(f"  {'stage':<10}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for stage in STAGES:
+            s = stages[stage]
+            print(f"  {stage:<10}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['p99']:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS],
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument("--scale", choices=SCALE_MODES, default=SCALE_NEAREST,
+                        help="presentation scale mode to measure")
+    parser.add_argument("--collide-scaling", action="store_true",
+                        help="also time groupcollide against the spatial hash from 250 to 8000 entities")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed p95 regression as a fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    game.init_display(args.scale)
+    game.load_fonts()
+    game.load_bg()
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "video_driver": pygame.display.get_driver(),
+            "frames": args.frames,
+            "seed": args.seed,
+            "scale": args.scale,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    for scn in SCENARIOS:
+        if args.scenario and scn.name not in args.scenario:
+            continue
+        if not scn.available():
+            print(f"skipping {scn.name}: needs numpy")
+            continue
+        results["scenarios"][scn.name] = run_scenario(scn, args.frames, args.warmup, args.seed)
+
+    if args.collide_scaling:
+        results["collide_scaling"] = collide_scaling(seed=args.seed)
+
+    print_table(results)
+    if args.collide_scaling:
+        print_collide_scaling(results["collide_scaling"])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.threshold)
+        if failures:
+            print("\nREGRESSIONS:")
+            for line in failures:
+                print("  " + line)
+            return 1
+        print(f"\nno p95 regression above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+# ======================================
+# CONFIG
+# ======================================
+BASE_WIDTH = 600
+BASE_HEIGHT = 800
+FPS = 60
+
+GAME_DURATION = 600
+MAX_WAVES = 5
+WAVE_LENGTH = 120  # seconds of game time per wave
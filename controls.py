@@ -0,0 +1,319 @@
+"""Input: declarative bindings from devices to actions, and per-tick gameplay input.
+
+InputRouter looks every event up in a per-state binding table instead of an
+if/elif chain. Controller buttons are bound by name ("action", "pause",
+"dpad_left", ...) and a controller profile maps names to button numbers, so
+remapping a pad is a profile change. Event types nothing is bound to are
+blocked in SDL with pygame.event.set_allowed and never reach Python; axis 0
+is polled once per tick instead of arriving as a stream of motion events.
+
+Gameplay actions are queued as small (kind, code) pairs and drained once per
+tick together with the quantized axis reading into an InputFrame; the same
+frame that drives a live tick can be recorded and fed back through
+PlayControls.apply() to repeat the run.
+"""
+import json
+import os
+
+import pygame
+
+from world import Inputs, PLAYER_SPEED
+
+STATE_MENU = "menu"
+STATE_PLAYING = "playing"
+STATE_PAUSE = "pause"
+STATE_GAMEOVER = "gameover"
+
+# Binding sources
+SRC_KEY = "key"
+SRC_BUTTON = "button"
+SRC_HAT_X = "hat_x"
+SRC_HAT_Y = "hat_y"
+ANY = "*"  # any code from that source
+
+# Bindings active in every state, checked first
+GLOBAL_BINDINGS = {
+    (SRC_KEY, pygame.K_F3): "profiler",
+    (SRC_KEY, pygame.K_F4): "export_profile",
+}
+
+# state -> {(source, code): action}
+BINDINGS = {
+    STATE_MENU: {
+        (SRC_KEY, pygame.K_UP): "up",
+        (SRC_KEY, pygame.K_DOWN): "down",
+        (SRC_KEY, pygame.K_RETURN): "select",
+        (SRC_HAT_Y, 1): "up",
+        (SRC_HAT_Y, -1): "down",
+        (SRC_BUTTON, "dpad_up"): "up",
+        (SRC_BUTTON, "dpad_down"): "down",
+        (SRC_BUTTON, "action"): "select",
+        (SRC_BUTTON, "pause"): "select",  # Start can also select in menu
+    },
+    STATE_PLAYING: {
+        (SRC_KEY, pygame.K_ESCAPE): "pause",
+        (SRC_BUTTON, "pause"): "pause",
+        (SRC_KEY, pygame.K_LEFT): "left",
+        (SRC_KEY, pygame.K_RIGHT): "right",
+        (SRC_KEY, pygame.K_SPACE): "fire",
+        (SRC_BUTTON, "action"): "fire",
+        (SRC_BUTTON, "dpad_left"): "left",
+        (SRC_BUTTON, "dpad_right"): "right",
+        (SRC_HAT_X, ANY): "steer",
+    },
+    STATE_PAUSE: {
+        (SRC_KEY, pygame.K_ESCAPE): "resume",
+        (SRC_KEY, pygame.K_UP): "up",
+        (SRC_KEY, pygame.K_DOWN): "down",
+        (SRC_KEY, pygame.K_RETURN): "select",
+        (SRC_HAT_Y, 1): "up",
+        (SRC_HAT_Y, -1): "down",
+        (SRC_BUTTON, "dpad_up"): "up",
+        (SRC_BUTTON, "dpad_down"): "down",
+        (SRC_BUTTON, "action"): "select",
+        (SRC_BUTTON, "pause"): "resume",  # Pressing pause again resumes
+    },
+    STATE_GAMEOVER: {
+        (SRC_KEY, ANY): "continue",
+        (SRC_BUTTON, ANY): "continue",
+    },
+}
+
+# Everything else is dropped inside SDL
+ALLOWED_EVENTS = [
+    pygame.QUIT, pygame.VIDEORESIZE, pygame.VIDEOEXPOSE,
+    pygame.KEYDOWN, pygame.KEYUP,
+    pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION,
+]
+
+CONTROLLER_PROFILES_FILE = "controllers.json"
+
+# Mixed mapping that covers Xbox, PlayStation and Switch Pro layouts
+DEFAULT_PROFILE = {
+    "buttons": {
+        "action": [0],             # A/Cross/B
+        "pause": [6, 7, 9, 10],    # Back/Start, Options, Plus
+        "dpad_up": [11],           # Switch Pro reports the d-pad as buttons 11-14
+        "dpad_down": [12],
+        "dpad_left": [13],
+        "dpad_right": [14],
+    },
+    "steer_axis": 0,
+}
+
+AXIS_DEADZONE = 0.2
+AXIS_SPEED = 8
+AXIS_SCALE = 32767  # axis readings are stored as int16
+
+
+# ======================================
+# CONTROLLER PROFILES
+# ======================================
+def load_profiles(path=CONTROLLER_PROFILES_FILE):
+    """Profiles from a JSON file: {"profiles": {name: profile}, "match": {substring: name}}."""
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {"profiles": {"default": DEFAULT_PROFILE}, "match": {}}
+    data.setdefault("profiles", {}).setdefault("default", DEFAULT_PROFILE)
+    data.setdefault("match", {})
+    return data
+
+
+def pick_profile(profiles, name=None, controller_name=""):
+    """Explicit `name`, else the first profile whose match string is in the controller name."""
+    if name is None:
+        name = "default"
+        for needle, profile in profiles["match"].items():
+            if needle.lower() in controller_name.lower():
+                name = profile
+                break
+    if name not in profiles["profiles"]:
+        raise ValueError(f"unknown controller profile {name!r}, have {sorted(profiles['profiles'])}")
+    return name, profiles["profiles"][name]
+
+
+def quantize_axis(value):
+    return max(-AXIS_SCALE, min(AXIS_SCALE, int(round(value * AXIS_SCALE))))
+
+
+# ======================================
+# INPUT ROUTER
+# ======================================
+class InputRouter:
+    """Maps events to (action, pressed, source, value) through the binding tables."""
+
+    def __init__(self, profile=DEFAULT_PROFILE, bindings=BINDINGS, global_bindings=GLOBAL_BINDINGS):
+        self.profile = profile
+        self.steer_axis = profile.get("steer_axis", 0)
+        # Button numbers -> names once, so routing a button is one dict lookup
+        self.button_names = {}
+        for name, numbers in profile["buttons"].items():
+            for n in numbers:
+                self.button_names.setdefault(n, []).append(name)
+        self.bindings = bindings
+        self.global_bindings = global_bindings
+        self.routed = 0
+
+    @staticmethod
+    def install_filter():
+        """Only let event types that are bound (plus window events) out of SDL."""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ALLOWED_EVENTS)
+
+    def _lookup(self, table, source, code):
+        action = table.get((source, code))
+        if action is None:
+            action = table.get((source, ANY))
+        return action
+
+    def route(self, state, event):
+        """Actions for one event in `state`; global bindings win over state bindings."""
+        t = event.type
+        if t == pygame.KEYDOWN or t == pygame.KEYUP:
+            lookups = [(SRC_KEY, event.key, t == pygame.KEYDOWN, None)]
+        elif t == pygame.JOYBUTTONDOWN or t == pygame.JOYBUTTONUP:
+            names = self.button_names.get(event.button) or [event.button]
+            lookups = [(SRC_BUTTON, name, t == pygame.JOYBUTTONDOWN, None) for name in names]
+        elif t == pygame.JOYHATMOTION:
+            x, y = event.value
+            lookups = [(SRC_HAT_X, x, True, x), (SRC_HAT_Y, y, True, y)]
+        else:
+            return []
+
+        table = self.bindings.get(state, {})
+        out = []
+        for source, code, pressed, value in lookups:
+            action = self._lookup(self.global_bindings, source, code)
+            if action is None:
+                action = self._lookup(table, source, code)
+            if action is not None:
+                out.append((action, pressed, source, value))
+        self.routed += len(out)
+        return out
+
+
+# ======================================
+# INPUT FRAME
+# ======================================
+# InputFrame event kinds (the device class matters to the steering rules)
+IN_KEYDOWN = 1
+IN_KEYUP = 2
+IN_BUTTONDOWN = 3
+IN_BUTTONUP = 4
+IN_HAT = 5
+
+# Gameplay action codes
+PLAY_LEFT = 0
+PLAY_RIGHT = 1
+PLAY_FIRE = 2
+PLAY_CODES = {"left": PLAY_LEFT, "right": PLAY_RIGHT, "fire": PLAY_FIRE}
+
+
+class InputFrame:
+    """Everything the player did during one tick: (kind, code) events and axis 0."""
+
+    __slots__ = ("events", "axis")
+
+    def __init__(self, events=(), axis=0):
+        self.events = events
+        self.axis = axis
+
+
+# ======================================
+# PLAY CONTROLS
+# ======================================
+class PlayControls:
+    """Turns routed gameplay actions into per-tick Inputs.
+
+    Holds the current speed and whether the keyboard or the controller is
+    steering.
+    """
+
+    def __init__(self):
+        self.pending = []
+        self.reset()
+
+    def reset(self):
+        self.pending.clear()
+        self.speedx = 0
+        self.keyboard_active = False
+
+    def push(self, action, pressed, source, value=None):
+        """Queue a gameplay action for the next tick; False if it is not one."""
+        if action == "steer":
+            self.pending.append((IN_HAT, value))
+            return True
+        code = PLAY_CODES.get(action)
+        if code is None:
+            return False
+        if source == SRC_KEY:
+            kind = IN_KEYDOWN if pressed else IN_KEYUP
+        else:
+            kind = IN_BUTTONDOWN if pressed else IN_BUTTONUP
+        self.pending.append((kind, code))
+        return True
+
+    def take_frame(self, axis=0.0):
+        """Drain the queue into the InputFrame for the tick about to run."""
+        frame = InputFrame(self.pending, quantize_axis(axis))
+        self.pending = []
+        return frame
+
+    def apply(self, frame):
+        """Advance the control state by one tick's frame and return its Inputs."""
+        shots = 0
+        deadzone = AXIS_DEADZONE * AXIS_SCALE
+        centered = abs(frame.axis) < deadzone
+        for kind, code in frame.events:
+            if kind == IN_KEYDOWN:
+                if code == PLAY_LEFT:
+                    self.speedx = -PLAYER_SPEED
+                    self.keyboard_active = True
+                elif code == PLAY_RIGHT:
+                    self.speedx = PLAYER_SPEED
+                    self.keyboard_active = True
+                elif code == PLAY_FIRE:
+                    shots += 1
+
+            elif kind == IN_KEYUP:
+                if code in (PLAY_LEFT, PLAY_RIGHT) and self.keyboard_active:
+                    self.speedx = 0
+
+            elif kind == IN_BUTTONDOWN:
+                if code == PLAY_FIRE:
+                    shots += 1
+                elif code == PLAY_LEFT:
+                    self.speedx = -PLAYER_SPEED
+                    self.keyboard_active = False
+                elif code == PLAY_RIGHT:
+                    self.speedx = PLAYER_SPEED
+                    self.keyboard_active = False
+
+            elif kind == IN_BUTTONUP:
+                # Only stop if analog stick is also centered
+                if code in (PLAY_LEFT, PLAY_RIGHT) and centered:
+                    self.speedx = 0
+
+            elif kind == IN_HAT:
+                if code == -1:
+                    self.speedx = -PLAYER_SPEED
+                    self.keyboard_active = False
+                elif code == 1:
+                    self.speedx = PLAYER_SPEED
+                    self.keyboard_active = False
+                elif centered:
+                    self.speedx = 0
+
+        # Analog stick control (overrides keyboard if active)
+        if abs(frame.axis) > deadzone:
+            self.speedx = int(frame.axis * AXIS_SPEED / AXIS_SCALE)
+            self.keyboard_active = False
+        elif not self.keyboard_active:
+            # Only reset speed if keyboard isn't being used
+            self.speedx = 0
+
+        return Inputs(self.speedx, shots)
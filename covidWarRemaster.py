@@ -1,88 +1,163 @@
-import pygame
+import argparse
 import random
 import sys
+import time
 
-# ======================================
-# CONFIG
-# ======================================
-BASE_WIDTH = 600
-BASE_HEIGHT = 800
-FPS = 60
-
-STATE_MENU = "menu"
-STATE_PLAYING = "playing"
-STATE_PAUSE = "pause"
-STATE_GAMEOVER = "gameover"
+# Taken before pygame is imported so time-to-first-frame covers the whole start
+STARTUP_T0 = time.perf_counter()
 
-GAME_DURATION = 600
-MAX_WAVES = 5
+import pygame
 
-pygame.init()
-pygame.mixer.init()
+from assets import assets
+from audio import audio
+from config import BASE_WIDTH, BASE_HEIGHT, FPS
+from controls import (
+    InputRouter, PlayControls, load_profiles, pick_profile,
+    STATE_MENU, STATE_PLAYING, STATE_PAUSE, STATE_GAMEOVER,
+)
+from effects import ParticleSystem, SCORE_FONT
+from governor import QualityGovernor, QUALITY_NAMES
+from hud import Hud
+from layers import ScreenCache, dim_overlay
+from loader import BackgroundLoader, StartupTimer
+from profiler import profiler
+from replay import Recorder
+from scores import SCORES_STEM, ScoreStore, run_stats
+from render import Presenter, DirtyRenderer, SCALE_MODES, SCALE_NEAREST, SCALE_SMOOTH
+from textcache import text_cache
+from timestep import FixedTimestep, Interpolator
+from world import World, EVENT_KILL, EVENT_PLAYER_HIT, EVENT_GAMEOVER
+
+
+# Font sizes; fonts and rendered strings are cached in text_cache
+FONT_BIG = 64
+FONT_SMALL = 26
+BUTTON_FONT = 30
+BUTTON_FONT_SELECTED = 42
 
 # ======================================
 # CONTROLLER INIT
 # ======================================
-pygame.joystick.init()
 controller = None
 
-if pygame.joystick.get_count() > 0:
-    controller = pygame.joystick.Joystick(0)
-    controller.init()
-    print("🎮 Controller connected:", controller.get_name())
-else:
-    print("⚠ No controller detected - keyboard controls available")
 
-# ===== WINDOW (MAXIMIZED SAFE) =====
-window = pygame.display.set_mode((1200, 800), pygame.RESIZABLE)
-pygame.display.set_caption("Covid19War")
+def init_controller():
+    global controller
+    pygame.joystick.init()
 
-game_surface = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
-clock = pygame.time.Clock()
+    if pygame.joystick.get_count() > 0:
+        controller = pygame.joystick.Joystick(0)
+        controller.init()
+        print("🎮 Controller connected:", controller.get_name())
+    else:
+        print("⚠ No controller detected - keyboard controls available")
 
-font_big = pygame.font.SysFont("arial", 64, bold=True)
-font = pygame.font.SysFont("arial", 26, bold=True)
 
 # ======================================
-# AUDIO
+# WINDOW
 # ======================================
-music_on = True
-sound_on = True
+presenter = None
+game_surface = None
+clock = None
+bg = None
+screen_cache = None
+
+
+def make_fallback_bg():
+    surf = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
+    surf.fill((20, 20, 40))
+    return surf
+
 
+def init_display(scale_mode=SCALE_NEAREST):
+    global presenter, game_surface, clock, bg, screen_cache
 
-def play_music():
-    if music_on:
-        try:
-            pygame.mixer.music.load("sounds/music.ogg")
-            pygame.mixer.music.play(-1)
-        except:
-            pass
+    # ===== WINDOW (MAXIMIZED SAFE) =====
+    presenter = Presenter(scale_mode)
+    presenter.open_window()
+    pygame.display.set_caption("Covid19War")
 
+    game_surface = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
+    screen_cache = ScreenCache((BASE_WIDTH, BASE_HEIGHT))
+    clock = pygame.time.Clock()
 
-def stop_music():
-    pygame.mixer.music.stop()
+    # Plain background until the loader has decoded bg.png
+    bg = make_fallback_bg()
 
 
-try:
-    boom_sound = pygame.mixer.Sound("boom.wav")
-except:
-    boom_sound = None
+def load_bg():
+    global bg
+    bg = assets.image("bg.png", alpha=False, size=(BASE_WIDTH, BASE_HEIGHT), fallback=make_fallback_bg)
+
+
+def load_fonts():
+    # Resolving a SysFont scans fontconfig; every size the game uses is resolved up front
+    for size in (FONT_BIG, FONT_SMALL, BUTTON_FONT, BUTTON_FONT_SELECTED, SCORE_FONT):
+        assets.font("arial", size, bold=True)
+
 
 # ======================================
-# BACKGROUND (FIXED IMAGE)
+# SPLASH / STAGED STARTUP
 # ======================================
-try:
-    bg = pygame.image.load("bg.png").convert()
-    bg = pygame.transform.scale(bg, (BASE_WIDTH, BASE_HEIGHT))
-except:
-    bg = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
-    bg.fill((20, 20, 40))
+splash_font = None
+startup = None
+loader = None
+
+
+def draw_splash(progress):
+    """Loading frame; uses pygame's built-in font so it needs no fontconfig scan."""
+    global splash_font
+    if splash_font is None:
+        splash_font = pygame.font.Font(None, 48)
+    game_surface.fill((20, 20, 40))
+    title = splash_font.render("Covid19War", True, (0, 255, 255))
+    game_surface.blit(title, (BASE_WIDTH // 2 - title.get_width() // 2, 330))
+    bar = pygame.Rect(BASE_WIDTH // 2 - 150, 420, 300, 12)
+    pygame.draw.rect(game_surface, (140, 140, 140), bar, 1)
+    pygame.draw.rect(game_surface, (0, 255, 255), (bar.x + 2, bar.y + 2, int((bar.w - 4) * progress), bar.h - 4))
+    presenter.present(game_surface)
+    pygame.display.update()
+
+
+def make_world():
+    global world
+    if args.swarm:
+        from swarm import SwarmWorld  # numpy is only imported for swarm mode
+        world = SwarmWorld(args.swarm, seed=args.seed)
+    else:
+        world = World(args.seed)
+    # Score, HP and wave reach the side panel as change notifications
+    hud.attach(world)
+
+
+def load_scores():
+    global high_score
+    # Reads the compact index, not the whole run history
+    scores.load()
+    high_score = max(high_score, scores.best)
+
+
+def startup_jobs():
+    """Background work in the order it is needed: menu first, audio, then the game."""
+    return [
+        ("fonts", load_fonts),
+        ("bg.png", load_bg),
+        ("audio", audio.init),
+        ("scores", load_scores),
+        ("world", make_world),
+    ]
+
 
 # ======================================
 # EFFECTS
 # ======================================
 shake_timer = 0
 
+# Set by the quality governor
+shake_enabled = True
+score_text_every = 1
+kill_count = 0
+
 
 # ======================================
 # BUTTON CLASS
@@ -93,10 +168,9 @@ class Button:
         self.y = y
 
     def draw(self, surf, selected=False):
-        size = 42 if selected else 30
-        f = pygame.font.SysFont("arial", size, bold=True)
+        size = BUTTON_FONT_SELECTED if selected else BUTTON_FONT
         color = (0, 255, 255) if selected else (140, 140, 140)
-        txt = f.render(self.text, True, color)
+        txt = text_cache.render(self.text, size, color)
         rect = txt.get_rect(center=(BASE_WIDTH // 2, self.y))
         surf.blit(txt, rect)
 
@@ -116,43 +190,48 @@ class StartMenu:
         self.update_text()
 
     def update_text(self):
-        self.buttons[1].text = f"Music: {'ON' if music_on else 'OFF'}"
-        self.buttons[2].text = f"Sound: {'ON' if sound_on else 'OFF'}"
+        self.buttons[1].text = f"Music: {'ON' if audio.music_on else 'OFF'}"
+        self.buttons[2].text = f"Sound: {'ON' if audio.sound_on else 'OFF'}"
 
     def move(self, d):
         self.index = (self.index + d) % len(self.buttons)
 
     def select(self):
-        global game_state, music_on, sound_on
+        global game_state
 
         if self.index == 0:
             reset_game()
             game_state = STATE_PLAYING
 
         elif self.index == 1:
-            music_on = not music_on
-            if music_on:
-                play_music()
-            else:
-                stop_music()
+            # Pauses and resumes the stream; the file is never reloaded
+            audio.set_music(not audio.music_on)
 
         elif self.index == 2:
-            sound_on = not sound_on
+            audio.sound_on = not audio.sound_on
 
         elif self.index == 3:
-            pygame.quit()
-            sys.exit()
+            quit_game()
 
         self.update_text()
 
-    def draw(self, surf):
+    def key(self):
+        """Everything the buttons layer depends on."""
+        return self.index, tuple(b.text for b in self.buttons)
+
+    def draw_base(self, surf):
         surf.blit(bg, (0, 0))
-        title = font_big.render("Injection Release", True, (0, 255, 255))
+        title = text_cache.render("Injection Release", FONT_BIG, (0, 255, 255))
         surf.blit(title, (BASE_WIDTH // 2 - title.get_width() // 2, 150))
 
+    def draw_buttons(self, surf):
         for i, b in enumerate(self.buttons):
             b.draw(surf, i == self.index)
 
+    def draw(self, surf):
+        self.draw_base(surf)
+        self.draw_buttons(surf)
+
 
 # ======================================
 # PAUSE MENU
@@ -160,6 +239,7 @@ class StartMenu:
 class PauseMenu:
     def __init__(self):
         self.index = 0
+        self.overlay = None
         self.buttons = [
             Button("Resume", 340),
             Button("Main Menu", 420),
@@ -169,14 +249,14 @@ class PauseMenu:
         self.update_text()
 
     def update_text(self):
-        self.buttons[2].text = f"Music: {'ON' if music_on else 'OFF'}"
-        self.buttons[3].text = f"Sound: {'ON' if sound_on else 'OFF'}"
+        self.buttons[2].text = f"Music: {'ON' if audio.music_on else 'OFF'}"
+        self.buttons[3].text = f"Sound: {'ON' if audio.sound_on else 'OFF'}"
 
     def move(self, d):
         self.index = (self.index + d) % len(self.buttons)
 
     def select(self):
-        global game_state, music_on, sound_on
+        global game_state
 
         if self.index == 0:
             game_state = STATE_PLAYING
@@ -185,592 +265,511 @@ class PauseMenu:
             game_state = STATE_MENU
 
         elif self.index == 2:
-            music_on = not music_on
-            if music_on:
-                play_music()
-            else:
-                stop_music()
+            # Pauses and resumes the stream; the file is never reloaded
+            audio.set_music(not audio.music_on)
 
         elif self.index == 3:
-            sound_on = not sound_on
+            audio.sound_on = not audio.sound_on
 
         self.update_text()
 
-    def draw(self, surf):
-        overlay = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
-        overlay.set_alpha(100)  # Reduced from 180 to 100 for better visibility
-        overlay.fill((0, 0, 0))
-        surf.blit(overlay, (0, 0))
+    def key(self):
+        return self.index, tuple(b.text for b in self.buttons)
+
+    def draw_base(self, surf, frozen):
+        """The frozen gameplay frame, dimmed, with the title."""
+        if self.overlay is None:
+            self.overlay = dim_overlay((BASE_WIDTH, BASE_HEIGHT), 100)  # Reduced from 180 to 100 for better visibility
+        surf.blit(frozen, (0, 0))
+        surf.blit(self.overlay, (0, 0))
 
-        title = font_big.render("GAME PAUSED", True, (0, 255, 255))
+        title = text_cache.render("GAME PAUSED", FONT_BIG, (0, 255, 255))
         surf.blit(title, (BASE_WIDTH // 2 - title.get_width() // 2, 180))
 
+    def draw_buttons(self, surf):
         for i, b in enumerate(self.buttons):
             b.draw(surf, i == self.index)
 
 
 # ======================================
-# PLAYER
+# EFFECTS (EXPLOSIONS, FLOATING POINTS)
 # ======================================
-class Player(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        try:
-            # Load with alpha channel for transparency
-            img1 = pygame.image.load("JiJiSR1.png").convert_alpha()
-            img2 = pygame.image.load("JiJiSR1L.png").convert_alpha()
-            img3 = pygame.image.load("JiJiSR1R.png").convert_alpha()
-            self.images = [img1, img2, img3]
-        except:
-            # Fallback if images don't exist
-            self.images = [pygame.Surface((40, 60), pygame.SRCALPHA) for _ in range(3)]
-            for img in self.images:
-                pygame.draw.polygon(img, (0, 255, 255), [(20, 0), (0, 60), (40, 60)])
-
-        self.image = self.images[0]
-        self.rect = self.image.get_rect(midbottom=(BASE_WIDTH // 2, BASE_HEIGHT - 40))
-        self.speedx = 0
-        self.life = 100
-        self.score = 0
-        self.hit_cooldown = 0
-
-    def update(self):
-        self.rect.x += self.speedx
-        self.rect.clamp_ip(pygame.Rect(0, 0, BASE_WIDTH, BASE_HEIGHT))
-
-        if self.speedx < 0:
-            self.image = self.images[1]
-        elif self.speedx > 0:
-            self.image = self.images[2]
-        else:
-            self.image = self.images[0]
-
-        if self.hit_cooldown > 0:
-            self.hit_cooldown -= 1
-
-    def shoot(self):
-        b = Cure(self.rect.centerx, self.rect.top)
-        allsprites.add(b)
-        cures.add(b)
-
-
-# ======================================
-# ENEMY
-# ======================================
-class Covid(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        try:
-            self.image = pygame.image.load("covid19.png").convert_alpha()
-        except:
-            self.image = pygame.Surface((30, 30), pygame.SRCALPHA)
-            pygame.draw.circle(self.image, (255, 50, 50), (15, 15), 15)
-
-        self.rect = self.image.get_rect()
-        self.respawn()
-
-    def respawn(self):
-        self.rect.x = random.randrange(BASE_WIDTH - self.rect.width)
-        self.rect.y = random.randrange(-100, -40)
-        self.speedy = random.randrange(2, 6)
-
-    def update(self):
-        self.rect.y += self.speedy
-        if self.rect.top > BASE_HEIGHT:
-            self.respawn()
-
-
-# ======================================
-# BULLET
-# ======================================
-class Cure(pygame.sprite.Sprite):
-    def __init__(self, x, y):
-        super().__init__()
-        try:
-            self.orig = pygame.image.load("cure.png").convert_alpha()
-        except:
-            self.orig = pygame.Surface((20, 20), pygame.SRCALPHA)
-            pygame.draw.circle(self.orig, (0, 255, 0), (10, 10), 10)
-
-        self.image = self.orig
-        self.rect = self.image.get_rect(centerx=x, bottom=y)
-        self.speedy = -8
-        self.rot = 0
-
-    def update(self):
-        self.rect.y += self.speedy
-        self.rot += 15
-
-        # Rotate with transparency preserved
-        rotated = pygame.transform.rotate(self.orig, self.rot)
-        self.image = rotated
-
-        # Update rect to keep it centered (rotation changes size)
-        old_center = self.rect.center
-        self.rect = self.image.get_rect()
-        self.rect.center = old_center
-
-        if self.rect.bottom < 0:
-            self.kill()
+particles = ParticleSystem()
 
 
 # ======================================
-# EXPLOSION
-# ======================================
-class Explosion:
-    def __init__(self, pos):
-        self.pos = pos
-        self.radius = 10
-        self.alpha = 255
-
-    def update(self):
-        self.radius += 3
-        self.alpha -= 12
-
-    def draw(self, surf):
-        if self.alpha > 0:
-            s = pygame.Surface((200, 200), pygame.SRCALPHA)
-            pygame.draw.circle(s, (255, 200, 0, self.alpha), (100, 100), self.radius, 3)
-            surf.blit(s, (self.pos[0] - 100, self.pos[1] - 100))
-
-
-explosions = []
-
-
-# ======================================
-# FLOATING TEXT (POINTS)
+# RESET GAME
 # ======================================
-class FloatingText:
-    def __init__(self, pos, text, points=100):
-        self.pos = list(pos)
-        self.text = text
-        self.points = points
-        self.alpha = 255
-        self.lifetime = 90  # 1.5 seconds at 60 FPS
-        self.age = 0
-
-        # Choose color based on points
-        if points >= 100:
-            self.color = (0, 255, 255)  # Cyan for normal
-        else:
-            self.color = (255, 255, 0)  # Yellow for special
-
-    def update(self):
-        self.age += 1
-        self.pos[1] -= 1  # Float upward
-
-        # Fade out in the last 0.5 seconds
-        if self.age > 60:
-            self.alpha = int(255 * (1 - (self.age - 60) / 30))
-
-        return self.age < self.lifetime
-
-    def draw(self, surf):
-        if self.alpha > 0:
-            f = pygame.font.SysFont("arial", 28, bold=True)
-            txt = f.render(f"+{self.points}", True, (*self.color, self.alpha))
-            rect = txt.get_rect(center=(self.pos[0], self.pos[1]))
+def reset_game():
+    global recorder, run_seed
 
-            # Add outline for better visibility
-            outline_f = pygame.font.SysFont("arial", 28, bold=True)
-            for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                outline = outline_f.render(f"+{self.points}", True, (0, 0, 0))
-                surf.blit(outline, (rect.x + dx, rect.y + dy))
+    if world is None:
+        loader.wait()  # Start pressed before the background loader built the world
+    finish_recording()
+    # Every run gets an explicit seed so it can be recorded and replayed
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    world.reset(seed)
+    run_seed = seed
+    timestep.reset()
+    interp.clear()
+    controls.reset()
+    if args.record:
+        recorder = Recorder(seed, args.swarm or 0)
 
-            surf.blit(txt, rect)
 
+def finish_recording():
+    global recorder
 
-floating_texts = []
+    if recorder is not None:
+        recorder.save(args.record, world.checksum())
+        print(f"recorded {recorder.ticks} ticks to {args.record}")
+        recorder = None
 
 
 # ======================================
-# RESET GAME
+# WORLD EVENTS
 # ======================================
-def reset_game():
-    global allsprites, covids, cures, player, game_start_time, current_wave
+def handle_world_events(events):
+    """Turn simulation events into sound, effects and state changes."""
+    global shake_timer, high_score, gameover_time, game_state, kill_count
 
-    allsprites = pygame.sprite.Group()
-    covids = pygame.sprite.Group()
-    cures = pygame.sprite.Group()
+    for kind, data in events:
+        if kind == EVENT_KILL:
+            audio.play("kill")
+            particles.spawn_ring(data)
 
-    player = Player()
-    allsprites.add(player)
+            # Add floating "+100" text (thinned out at low quality)
+            kill_count += 1
+            if kill_count % score_text_every == 0:
+                particles.spawn_score(data, 100)
 
-    for i in range(6):
-        c = Covid()
-        allsprites.add(c)
-        covids.add(c)
+        elif kind == EVENT_PLAYER_HIT:
+            if shake_enabled:
+                shake_timer = 15  # Screen shake duration
+            audio.play("hit")
 
-    game_start_time = pygame.time.get_ticks()
-    current_wave = 1
+        elif kind == EVENT_GAMEOVER:
+            if world.player.score > high_score:
+                high_score = world.player.score
+            # Queued for the writer thread; nothing touches the disk this frame
+            scores.record(run_stats(world, run_seed))
+            gameover_time = pygame.time.get_ticks()
+            finish_recording()
+            game_state = STATE_GAMEOVER
 
 
 # ======================================
 # CENTER DRAW + SHAKE
 # ======================================
 def draw_centered():
-    global shake_timer
-
-    window.fill((0, 0, 0))
-    win_w, win_h = window.get_size()
+    # Shake only moves where the scaled frame is blitted; it counts down in game ticks
+    offset = (0, 0)
+    if shake_timer > 0 and game_state == STATE_PLAYING:
+        offset = (random.randint(-12, 12), random.randint(-12, 12))  # Increased shake intensity
 
-    scale = min(win_w / BASE_WIDTH, win_h / BASE_HEIGHT)
-    new_w = int(BASE_WIDTH * scale)
-    new_h = int(BASE_HEIGHT * scale)
-
-    scaled = pygame.transform.scale(game_surface, (new_w, new_h))
-
-    x = (win_w - new_w) // 2
-    y = (win_h - new_h) // 2
-
-    if shake_timer > 0:
-        x += random.randint(-12, 12)  # Increased shake intensity
-        y += random.randint(-12, 12)
-        shake_timer -= 1
-
-    window.blit(scaled, (x, y))
+    presenter.present(game_surface, offset)
 
 
 # ======================================
 # SIDE UI
 # ======================================
-def draw_side_ui():
-    win_w, _ = window.get_size()
-    if win_w > BASE_WIDTH:
-        right = win_w - 200
-
-        window.blit(font.render(f"Score: {player.score}", True, (0, 255, 255)), (right, 60))
-        window.blit(font.render(f"HP: {player.life}", True, (0, 255, 255)), (right, 110))
-        pygame.draw.rect(window, (255, 255, 255), (right, 140, 120, 12))
-        pygame.draw.rect(window, (0, 255, 255), (right, 140, player.life, 12))
-        window.blit(font.render(f"Wave {current_wave}/{MAX_WAVES}", True, (255, 255, 0)), (right, 190))
-        pygame.draw.rect(window, (255, 255, 255), (right, 220, 120, 12))
-        pygame.draw.rect(window, (255, 255, 0), (right, 220, int((current_wave / MAX_WAVES) * 120), 12))
-
-
-# ======================================
-# CONTROLLER HELPERS
-# ======================================
-def is_pause_button(button_num):
-    """
-    Check if button is a pause/start button
-    Common mappings:
-    - Xbox controller: button 7 (Start)
-    - PlayStation: button 9 (Options)
-    - Nintendo Switch Pro: button 10 (Plus)
-    - Some controllers: button 6
-    """
-    return button_num in [6, 7, 9, 10]
-
-
-def is_action_button(button_num):
-    """Primary action button (A/Cross/B)"""
-    return button_num == 0
-
+hud = Hud()
 
-def is_back_button(button_num):
-    """Back/Select button"""
-    return button_num in [1, 6, 8]
 
-
-def is_dpad_up(button_num):
-    """D-pad Up (Nintendo Switch Pro: button 11)"""
-    return button_num == 11
-
-
-def is_dpad_down(button_num):
-    """D-pad Down (Nintendo Switch Pro: button 12)"""
-    return button_num == 12
-
-
-def is_dpad_left(button_num):
-    """D-pad Left (Nintendo Switch Pro: button 13)"""
-    return button_num == 13
-
-
-def is_dpad_right(button_num):
-    """D-pad Right (Nintendo Switch Pro: button 14)"""
-    return button_num == 14
+def draw_side_ui(force=True):
+    """Blit the cached score/HP/wave panel right of the playfield; returns its rect or None."""
+    return hud.draw(presenter.window, force)
 
 
 # ======================================
 # INIT
 # ======================================
+args = None
+world = None
 start_menu = StartMenu()
 pause_menu = PauseMenu()
-play_music()
 
 game_state = STATE_MENU
 high_score = 0
 running = True
 gameover_time = 0
 
-# Variables to prevent keyboard/controller conflicts during gameplay
-keyboard_control_active = False
+dirty = DirtyRenderer()
+
+# Game time runs in fixed 1/60 s ticks; rendering blends between the last two
+timestep = FixedTimestep(FPS)
+interp = Interpolator()
+
+# Input collected from events, handed to the world once per tick
+controls = PlayControls()
+recorder = None
+run_seed = None
+
+# Leaderboard and run statistics, written by a background thread
+scores = None
+
+# Steps effects quality down when frames run over budget (--quality)
+governor = None
+
+
+def apply_quality(quality):
+    global shake_enabled, score_text_every, shake_timer
+
+    particles.set_cap(quality.particles)
+    particles.outline = quality.outline
+    shake_enabled = quality.shake
+    if not shake_enabled:
+        shake_timer = 0
+    score_text_every = quality.text_every
+    # Only ever falls back from the smooth scaling the player asked for
+    if args.scale == SCALE_SMOOTH:
+        presenter.mode = SCALE_SMOOTH if quality.smooth else SCALE_NEAREST
+
+
+def seed_arg(text):
+    """--seed value: recordings store it as an unsigned 64-bit integer and numpy rejects negatives."""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed {text!r}") from None
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {2 ** 64 - 1}")
+    return seed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Covid19War")
+    parser.add_argument("--asset-report", action="store_true",
+                        help="print asset load times and text cache counters on exit")
+    parser.add_argument("--scale", choices=SCALE_MODES, default=SCALE_NEAREST,
+                        help="how the 600x800 playfield is scaled to the window (default: nearest)")
+    parser.add_argument("--dirty", action="store_true",
+                        help="only redraw and present the parts of the playfield that changed")
+    parser.add_argument("--swarm", type=int, metavar="N",
+                        help="swarm/stress mode: N enemies kept in NumPy arrays (needs numpy)")
+    parser.add_argument("--render-fps", type=int, default=FPS, metavar="N",
+                        help="cap on rendered frames per second, 0 for uncapped (game speed stays 60 Hz)")
+    parser.add_argument("--seed", type=seed_arg, metavar="N",
+                        help="seed every run with N instead of a random seed")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record each run's per-tick input to PATH (replay with replay.py)")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="exit as soon as the menu is interactive (for timing startup)")
+    parser.add_argument("--controls", default="controllers.json", metavar="PATH",
+                        help="controller profiles file (default: controllers.json)")
+    parser.add_argument("--controller-profile", metavar="NAME",
+                        help="use this controller profile instead of matching the pad's name")
+    parser.add_argument("--scores", default=SCORES_STEM, metavar="STEM",
+                        help="high-score store: STEM.jsonl journal and STEM.idx.json index; "
+                             "relative to the game directory (default: scores)")
+    parser.add_argument("--quality", choices=("auto",) + QUALITY_NAMES, default="auto",
+                        help="effects quality; auto (default) lowers it when frames miss the 60 FPS budget")
+    parser.add_argument("--stats", action="store_true",
+                        help="print object pool, effect and renderer counters on exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame profiler overlay on (toggle with F3)")
+    parser.add_argument("--profile-out", metavar="STEM",
+                        help="write the profiler capture to STEM.json and STEM.csv on exit")
+    return parser.parse_args(argv)
+
+
+def quit_game():
+    if world is not None:
+        finish_recording()
+    if scores is not None:
+        scores.close()  # flush runs still queued for the writer
+    if args and args.asset_report:
+        print(assets.report())
+        print("text cache:", text_cache.stats())
+    if args and args.stats:
+        if hasattr(world, "pool_stats"):
+            for name, stats in world.pool_stats().items():
+                print(f"{name} pool:", stats)
+        print("particles:", particles.stats())
+        print("audio:", audio.stats())
+        print("dirty renderer:", dirty.stats)
+        print("static screens:", screen_cache.stats())
+        print("hud:", hud.stats())
+        if scores is not None:
+            print("scores:", scores.stats())
+        if governor is not None:
+            print("quality:", governor.stats())
+        print("timestep:", timestep.stats())
+        if loader is not None:
+            print("loader:", ", ".join(f"{label} {ms:.0f} ms" for label, ms in loader.timings))
+    if args and args.profile_out and profiler.frames:
+        print("profile written to", *profiler.export(args.profile_out))
+    pygame.quit()
+    sys.exit()
+
+
+# ======================================
+# STATIC SCREENS (MENU, PAUSE, GAME OVER)
+# ======================================
+def draw_gameover_base(surf):
+    surf.fill((0, 0, 0))
+    t1 = text_cache.render("MISSION END", FONT_BIG, (0, 255, 255))
+    t2 = text_cache.render(f"Score {world.player.score}", FONT_SMALL, (255, 255, 255))
+    t3 = text_cache.render(f"Best {high_score}", FONT_SMALL, (255, 255, 0))
+    surf.blit(t1, (BASE_WIDTH // 2 - t1.get_width() // 2, 300))
+    surf.blit(t2, (BASE_WIDTH // 2 - t2.get_width() // 2, 420))
+    surf.blit(t3, (BASE_WIDTH // 2 - t3.get_width() // 2, 460))
+
+
+def draw_gameover_blink(surf):
+    # Blinking text
+    if (pygame.time.get_ticks() // 500) % 2 == 0:
+        t4 = text_cache.render("Press any key to continue", FONT_SMALL, (140, 140, 140))
+        surf.blit(t4, (BASE_WIDTH // 2 - t4.get_width() // 2, 550))
+
+
+def draw_static_screen():
+    """Compose the current non-gameplay screen; False if it is unchanged since last frame.
+
+    The pause screen's base is the last gameplay frame, which is still on
+    game_surface when the cache is invalidated on entering pause.
+    """
+    if game_state == STATE_MENU:
+        return screen_cache.show(game_surface, STATE_MENU, start_menu.draw_base,
+                                 start_menu.key(), start_menu.draw_buttons)
+    if game_state == STATE_PAUSE:
+        return screen_cache.show(game_surface, STATE_PAUSE,
+                                 lambda surf: pause_menu.draw_base(surf, game_surface),
+                                 pause_menu.key(), pause_menu.draw_buttons)
+    if game_state == STATE_GAMEOVER:
+        return screen_cache.show(game_surface, STATE_GAMEOVER, draw_gameover_base,
+                                 (pygame.time.get_ticks() // 500) % 2, draw_gameover_blink)
+    return True
+
+
+# ======================================
+# INPUT ACTIONS
+# ======================================
+router = None
+
+
+def init_input():
+    """Pick the controller profile, build the router and filter events in SDL."""
+    global router
+    profiles = load_profiles(args.controls)
+    name, profile = pick_profile(profiles, args.controller_profile,
+                                 controller.get_name() if controller else "")
+    if controller:
+        print("🎮 Controller profile:", name)
+    router = InputRouter(profile)
+    router.install_filter()
+
+
+def handle_action(action, pressed, source, value):
+    """Apply one routed action in the current state; see controls.BINDINGS."""
+    global game_state
+
+    if action == "profiler":
+        if pressed:
+            profiler.toggle()
+            presenter.invalidate()
+        return
+    if action == "export_profile":
+        if pressed:
+            stem = time.strftime("profile-%Y%m%d-%H%M%S")
+            print("profile written to", *profiler.export(stem))
+        return
+
+    if game_state == STATE_PLAYING:
+        if action == "pause":
+            if pressed:
+                game_state = STATE_PAUSE
+        else:
+            # Movement and shots are queued and applied on the next tick
+            controls.push(action, pressed, source, value)
+        return
+
+    if not pressed:
+        return
+    if game_state in (STATE_MENU, STATE_PAUSE):
+        menu = start_menu if game_state == STATE_MENU else pause_menu
+        if action == "up":
+            menu.move(-1)
+        elif action == "down":
+            menu.move(1)
+        elif action == "select":
+            menu.select()
+        elif action == "resume":
+            game_state = STATE_PLAYING
+    elif game_state == STATE_GAMEOVER and action == "continue":
+        if pygame.time.get_ticks() - gameover_time > 1000:  # Prevent accidental skip
+            game_state = STATE_MENU
+
 
 # ======================================
 # MAIN LOOP
 # ======================================
-while running:
-    clock.tick(FPS)
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-        # ==================== MENU STATE ====================
-        if game_state == STATE_MENU:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    start_menu.move(-1)
-                elif event.key == pygame.K_DOWN:
-                    start_menu.move(1)
-                elif event.key == pygame.K_RETURN:
-                    start_menu.select()
-
-            # Controller D-pad for menu navigation (hat motion)
-            elif event.type == pygame.JOYHATMOTION:
-                if event.value[1] == 1:  # Up
-                    start_menu.move(-1)
-                elif event.value[1] == -1:  # Down
-                    start_menu.move(1)
-
-            # Controller buttons in menu
-            elif event.type == pygame.JOYBUTTONDOWN:
-                # print(f"🎮 Menu - Button {event.button} pressed")
-
-                # D-pad navigation (Nintendo Switch Pro controller uses buttons)
-                if is_dpad_up(event.button):
-                    start_menu.move(-1)
-                elif is_dpad_down(event.button):
-                    start_menu.move(1)
-                elif is_action_button(event.button):
-                    start_menu.select()
-                elif is_pause_button(event.button):
-                    # Start button can also select in menu
-                    start_menu.select()
-
-        # ==================== PLAYING STATE ====================
-        elif game_state == STATE_PLAYING:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    game_state = STATE_PAUSE
-                    # print("⏸ Paused via keyboard")
-                elif event.key == pygame.K_LEFT:
-                    player.speedx = -6
-                    keyboard_control_active = True
-                elif event.key == pygame.K_RIGHT:
-                    player.speedx = 6
-                    keyboard_control_active = True
-                elif event.key == pygame.K_SPACE:
-                    player.shoot()
-
-            elif event.type == pygame.KEYUP:
-                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
-                    if keyboard_control_active:
-                        player.speedx = 0
-
-            # Controller buttons during gameplay
-            elif event.type == pygame.JOYBUTTONDOWN:
-                # print(f"🎮 Game - Button {event.button} pressed")
-
-                # Check for pause button FIRST (most important)
-                if is_pause_button(event.button):
-                    game_state = STATE_PAUSE
-                    # print(f"⏸ Paused via controller button {event.button}")
-
-                # Shoot button (A/Cross/B)
-                elif is_action_button(event.button):
-                    player.shoot()
-                    # print("💉 Shot fired")
-
-                # D-pad movement (Nintendo Switch Pro - press and hold)
-                elif is_dpad_left(event.button):
-                    player.speedx = -6
-                    keyboard_control_active = False
-                elif is_dpad_right(event.button):
-                    player.speedx = 6
-                    keyboard_control_active = False
-
-                # Debug - show unmapped buttons
-                else:
+def main(argv=None):
+    global args, game_state, shake_timer, startup, loader, scores, governor
+
+    args = parse_args(argv)
+    startup = StartupTimer(STARTUP_T0)
+    scores = ScoreStore(args.scores)
+    if args.quality == "auto":
+        governor = QualityGovernor(on_change=apply_quality)
+    else:
+        governor = QualityGovernor(start=QUALITY_NAMES.index(args.quality), adaptive=False,
+                                   on_change=apply_quality)
+
+    # Stage 1: only what the first frame needs
+    pygame.display.init()
+    pygame.font.init()
+    init_display(args.scale)
+    governor.apply()
+    draw_splash(0.0)
+    startup.mark("first_frame")
+
+    # Stage 2: fonts, images, audio and the world load on a thread behind the splash
+    loader = BackgroundLoader(startup_jobs()).start()
+    init_controller()
+    init_input()
+    while not loader.finished("fonts", "bg.png"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_game()
+        draw_splash(loader.progress)
+        clock.tick(FPS)
+
+    if args.profile:
+        profiler.toggle()
+    music_started = False
+    drawn_state = None
+
+    while running:
+        if not music_started and loader.finished("audio"):
+            audio.play_music()
+            music_started = True
+        audio.end_frame()
+
+        profiler.begin_frame()
+        frame_time = clock.tick(args.render_fps) / 1000
+        if game_state == STATE_PLAYING:
+            # Work time of the previous frame, without the wait inside tick()
+            governor.update(clock.get_rawtime())
+        profiler.mark("wait")
+
+        events = pygame.event.get()
+        profiler.mark("event_pump")
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                quit_game()
+            elif event.type == pygame.VIDEORESIZE:
+                presenter.resize()
+            elif event.type == pygame.VIDEOEXPOSE:
+                # Uncovered window: a cached static screen must be presented again
+                presenter.invalidate()
+            else:
+                routed = router.route(game_state, event)
+                for action, pressed, source, value in routed:
+                    handle_action(action, pressed, source, value)
+                if not routed and event.type == pygame.JOYBUTTONDOWN and game_state == STATE_PLAYING:
+                    # Debug - show unmapped buttons
                     print(f"❓ Unmapped button {event.button}")
 
-            # D-pad button release (Nintendo Switch Pro)
-            elif event.type == pygame.JOYBUTTONUP:
-                if is_dpad_left(event.button) or is_dpad_right(event.button):
-                    # Only stop if analog stick is also centered
-                    if controller and abs(controller.get_axis(0)) < 0.2:
-                        player.speedx = 0
-
-            # D-pad for movement (hat motion - for other controllers)
-            elif event.type == pygame.JOYHATMOTION:
-                if event.value[0] == -1:  # Left
-                    player.speedx = -6
-                    keyboard_control_active = False
-                elif event.value[0] == 1:  # Right
-                    player.speedx = 6
-                    keyboard_control_active = False
-                elif event.value[0] == 0:  # Centered
-                    # Only stop if analog stick is also centered
-                    if controller and abs(controller.get_axis(0)) < 0.2:
-                        player.speedx = 0
-
-        # ==================== PAUSE STATE ====================
-        elif game_state == STATE_PAUSE:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    game_state = STATE_PLAYING
-                    # print("▶ Resumed via keyboard")
-                elif event.key == pygame.K_UP:
-                    pause_menu.move(-1)
-                elif event.key == pygame.K_DOWN:
-                    pause_menu.move(1)
-                elif event.key == pygame.K_RETURN:
-                    pause_menu.select()
-
-            # Controller D-pad in pause menu (hat motion)
-            elif event.type == pygame.JOYHATMOTION:
-                if event.value[1] == 1:  # Up
-                    pause_menu.move(-1)
-                elif event.value[1] == -1:  # Down
-                    pause_menu.move(1)
-
-            # Controller buttons in pause menu
-            elif event.type == pygame.JOYBUTTONDOWN:
-                # print(f"🎮 Pause - Button {event.button} pressed")
-
-                # D-pad navigation (Nintendo Switch Pro controller uses buttons)
-                if is_dpad_up(event.button):
-                    pause_menu.move(-1)
-                elif is_dpad_down(event.button):
-                    pause_menu.move(1)
-                elif is_action_button(event.button):
-                    pause_menu.select()
-                elif is_pause_button(event.button):
-                    # Pressing pause again resumes
-                    game_state = STATE_PLAYING
-                    # print(f"▶ Resumed via controller button {event.button}")
-
-        # ==================== GAME OVER STATE ====================
-        elif game_state == STATE_GAMEOVER:
-            # Allow any button to skip to menu
-            if event.type == pygame.KEYDOWN or event.type == pygame.JOYBUTTONDOWN:
-                if pygame.time.get_ticks() - gameover_time > 1000:  # Prevent accidental skip
-                    game_state = STATE_MENU
-
-    # ==================== UPDATE ====================
-    if game_state == STATE_PLAYING:
-
-        # Analog stick control (overrides keyboard if active)
-        if controller:
-            axis = controller.get_axis(0)
-            if abs(axis) > 0.2:
-                player.speedx = int(axis * 8)
-                keyboard_control_active = False
-            elif not keyboard_control_active:
-                # Only reset speed if keyboard isn't being used
-                player.speedx = 0
-
-        allsprites.update()
-
-        # Collision: bullets hit enemies
-        hits = pygame.sprite.groupcollide(covids, cures, True, True)
-        for h in hits:
-            player.score += 100
-            if sound_on and boom_sound:
-                boom_sound.play()
-            explosions.append(Explosion(h.rect.center))
-
-            # Add floating "+100" text
-            floating_texts.append(FloatingText(h.rect.center, "+100", 100))
-
-            # Spawn new enemy
-            c = Covid()
-            allsprites.add(c)
-            covids.add(c)
-
-        # Collision: enemies hit player
-        hits = pygame.sprite.spritecollide(player, covids, False)
-        if hits and player.hit_cooldown == 0:
-            player.life -= 10
-            player.hit_cooldown = 60
-            shake_timer = 15  # Screen shake duration
-            if sound_on and boom_sound:
-                boom_sound.play()
-
-            if player.life <= 0:
-                if player.score > high_score:
-                    high_score = player.score
-                gameover_time = pygame.time.get_ticks()
-                game_state = STATE_GAMEOVER
-
-        # Wave progression
-        elapsed = (pygame.time.get_ticks() - game_start_time) / 1000
-        new_wave = int(elapsed // 120) + 1
-        if new_wave != current_wave and new_wave <= MAX_WAVES:
-            current_wave = new_wave
-            # Spawn more enemies each wave
-            for i in range(3 + current_wave):
-                c = Covid()
-                allsprites.add(c)
-                covids.add(c)
-
-        # Update explosions
-        for e in explosions:
-            e.update()
-        explosions[:] = [e for e in explosions if e.alpha > 0]
-
-        # Update floating texts
-        floating_texts[:] = [ft for ft in floating_texts if ft.update()]
-
-    # ==================== DRAW ====================
-    game_surface.fill((0, 0, 0))
-
-    if game_state == STATE_MENU:
-        start_menu.draw(game_surface)
-
-    elif game_state == STATE_PLAYING:
-        game_surface.blit(bg, (0, 0))
-        allsprites.draw(game_surface)
-        for e in explosions:
-            e.draw(game_surface)
-        for ft in floating_texts:
-            ft.draw(game_surface)
-
-    elif game_state == STATE_PAUSE:
-        # Draw game underneath
-        game_surface.blit(bg, (0, 0))
-        allsprites.draw(game_surface)
-        for e in explosions:
-            e.draw(game_surface)
-
-        # Draw pause menu on top
-        pause_menu.draw(game_surface)
-
-    elif game_state == STATE_GAMEOVER:
-        game_surface.fill((0, 0, 0))
-        t1 = font_big.render("MISSION END", True, (0, 255, 255))
-        t2 = font.render(f"Score {player.score}", True, (255, 255, 255))
-        t3 = font.render(f"Best {high_score}", True, (255, 255, 0))
-        t4 = font.render("Press any key to continue", True, (140, 140, 140))
-
-        game_surface.blit(t1, (BASE_WIDTH // 2 - t1.get_width() // 2, 300))
-        game_surface.blit(t2, (BASE_WIDTH // 2 - t2.get_width() // 2, 420))
-        game_surface.blit(t3, (BASE_WIDTH // 2 - t3.get_width() // 2, 460))
-
-        # Blinking text
-        if (pygame.time.get_ticks() // 500) % 2 == 0:
-            game_surface.blit(t4, (BASE_WIDTH // 2 - t4.get_width() // 2, 550))
-
-        # Auto-return to menu after 8 seconds
-        if pygame.time.get_ticks() - gameover_time > 8000:
-            game_state = STATE_MENU
-
-    draw_centered()
+        profiler.mark("input")
+
+        # ==================== UPDATE ====================
+        if game_state == STATE_PLAYING:
+            mark = profiler.mark if profiler.enabled else None
+            steps = timestep.advance(frame_time)
+            for i in range(steps):
+                if not args.swarm and i == steps - 1:
+                    interp.capture(world.allsprites)
+                # Axis motion events are filtered out; the stick is polled once per tick
+                frame = controls.take_frame(controller.get_axis(router.steer_axis) if controller else 0.0)
+                if recorder is not None:
+                    recorder.add(frame)
+                handle_world_events(world.step(controls.apply(frame), mark=mark))
+
+                # Update explosions, floating texts and shake once per tick as well
+                particles.update()
+                if shake_timer > 0:
+                    shake_timer -= 1
+                if game_state != STATE_PLAYING:
+                    break
+            profiler.mark("effects")
+        else:
+            # Time spent paused or in menus is not owed to the simulation
+            timestep.reset()
+
+        # ==================== DRAW ====================
+        # Dirty-rect mode only covers plain sprite gameplay; shake and the overlay need full frames
+        use_dirty = (args.dirty and not args.swarm and game_state == STATE_PLAYING
+                     and shake_timer == 0 and not profiler.enabled)
+        if not use_dirty:
+            dirty.invalidate()
+        if game_state != drawn_state:
+            screen_cache.invalidate()
+            # The side panel is only drawn while playing; clear it off the window on any change
+            presenter.invalidate()
+            drawn_state = game_state
+
+        changed = True
+        if use_dirty:
+            game_rects = dirty.draw_playing(game_surface, bg, world.allsprites, particles,
+                                            draw=lambda g, surf: interp.draw(g, surf, timestep.alpha))
 
-    if game_state == STATE_PLAYING:
-        draw_side_ui()
+        elif game_state == STATE_PLAYING:
+            game_surface.blit(bg, (0, 0))
+            if args.swarm:
+                world.allsprites.draw(game_surface)
+            else:
+                interp.draw(world.allsprites, game_surface, timestep.alpha)
+            particles.draw(game_surface)
 
-    pygame.display.update()
\ No newline at end of file
+        else:
+            changed = draw_static_screen()
+
+            # Auto-return to menu after 8 seconds
+            if game_state == STATE_GAMEOVER and pygame.time.get_ticks() - gameover_time > 8000:
+                game_state = STATE_MENU
+
+        profiler.mark("draw")
+
+        if use_dirty:
+            update_rects = dirty.present(presenter, game_surface, game_rects)
+            # The panel is only re-sent when it changed or a present may have painted over it
+            panel = hud.rect(presenter.window)
+            hud_rect = draw_side_ui(force=game_rects is None or (
+                panel is not None and panel.collidelist(update_rects) != -1))
+            if hud_rect:
+                update_rects.append(hud_rect)
+            pygame.display.update(update_rects)
+            profiler.mark("present")
+            profiler.end_frame()
+            continue
+
+        if profiler.enabled:
+            presenter.invalidate()
+        elif not changed and not presenter.needs_clear:
+            # Menu, pause and game over frames that did not change are not scaled or presented
+            profiler.end_frame()
+            continue
+        draw_centered()
+        profiler.mark("draw_centered")
+
+        if game_state == STATE_PLAYING:
+            draw_side_ui()
+            profiler.mark("side_ui")
+
+        profiler.draw(presenter.window)
+        pygame.display.update()
+        profiler.mark("present")
+        profiler.end_frame()
+
+        if startup.get("interactive") is None:
+            # The first menu frame is on screen and input is live from here on
+            startup.mark("interactive")
+            print(startup.report())
+            if args.startup_only:
+                quit_game()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import sys
+
+import pygame
+
+from textcache import text_cache
+
+EXPLOSION_COLOR = (255, 200, 0)
+EXPLOSION_START_RADIUS = 10
+EXPLOSION_GROWTH = 3
+EXPLOSION_FADE = 12
+EXPLOSION_RING_WIDTH = 3
+
+SCORE_LIFETIME = 90  # 1.5 seconds at 60 FPS
+SCORE_FADE_START = 60
+SCORE_RISE = -1
+SCORE_FONT = 28
+
+MAX_PARTICLES = 128
+
+# Particle kinds; draw() dispatches on these
+PARTICLE_RING = 0
+PARTICLE_TEXT = 1
+
+
+# ======================================
+# EXPLOSION RING FRAMES
+# ======================================
+def bake_explosion_frames():
+    """One ring surface per age step: radius grows by 3 and alpha drops by 12."""
+    frames = []
+    age = 0
+    while 255 - EXPLOSION_FADE * age > 0:
+        radius = EXPLOSION_START_RADIUS + EXPLOSION_GROWTH * age
+        alpha = 255 - EXPLOSION_FADE * age
+        half = radius + 1
+        img = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        pygame.draw.circle(img, (*EXPLOSION_COLOR, alpha), (half, half), radius, EXPLOSION_RING_WIDTH)
+        frames.append((img, half))
+        age += 1
+    return frames
+
+
+# ======================================
+# PARTICLE
+# ======================================
+class Particle:
+    """One effect slot. Preallocated and overwritten, never freed."""
+
+    __slots__ = ("kind", "x", "y", "vx", "vy", "age", "life", "color", "label")
+
+    def __init__(self):
+        self.kind = PARTICLE_RING
+        self.x = 0
+        self.y = 0
+        self.vx = 0
+        self.vy = 0
+        self.age = 0
+        self.life = 0
+        self.color = None
+        self.label = None
+
+
+# ======================================
+# PARTICLE SYSTEM
+# ======================================
+class ParticleSystem:
+    """Explosion rings and score labels in one fixed-size ring buffer.
+
+    Live particles occupy `count` consecutive slots starting at `head`,
+    oldest first. When the budget is full a new particle overwrites the
+    oldest one; set_cap() lowers that limit below the budget at runtime
+    without reallocating. update() ages, moves and culls in a single pass by swapping
+    survivors down, so no list is rebuilt and no object is allocated after
+    construction.
+    """
+
+    def __init__(self, budget=MAX_PARTICLES):
+        self.frames = None
+        self.outline = True  # score labels with a black outline
+        self.set_budget(budget)
+
+    def set_budget(self, budget):
+        """Reallocate the buffer for `budget` particles; drops everything live."""
+        self.slots = [Particle() for _ in range(budget)]
+        self.budget = budget
+        self.cap = budget
+        self.head = 0
+        self.count = 0
+        self.high_water = 0
+        self.spawned = 0
+        self.evicted = 0
+
+    def set_cap(self, cap):
+        """Keep at most `cap` particles live (never more than the budget); drops the oldest."""
+        self.cap = max(0, min(cap, self.budget))
+        while self.count > self.cap:
+            self.head = (self.head + 1) % self.budget
+            self.count -= 1
+            self.evicted += 1
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def _frames(self):
+        if self.frames is None:
+            self.frames = bake_explosion_frames()
+        return self.frames
+
+    def spawn(self, kind, x, y, vx=0, vy=0, life=1, color=None, label=None):
+        """Claim the next slot; returns the particle for callers that add fields."""
+        if not self.cap:
+            return None
+        if self.count == self.cap:
+            # Full: the oldest particle makes room
+            self.head = (self.head + 1) % self.budget
+            self.count -= 1
+            self.evicted += 1
+        p = self.slots[(self.head + self.count) % self.budget]
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        p.kind = kind
+        p.x = x
+        p.y = y
+        p.vx = vx
+        p.vy = vy
+        p.age = 0
+        p.life = life
+        p.color = color
+        p.label = label
+        self.spawned += 1
+        return p
+
+    def spawn_ring(self, pos):
+        return self.spawn(PARTICLE_RING, pos[0], pos[1], life=len(self._frames()))
+
+    def spawn_score(self, pos, points=100):
+        # Cyan for normal kills, yellow for special
+        color = (0, 255, 255) if points >= 100 else (255, 255, 0)
+        return self.spawn(PARTICLE_TEXT, pos[0], pos[1], vy=SCORE_RISE,
+                          life=SCORE_LIFETIME, color=color, label=f"+{points}")
+
+    def update(self):
+        slots, n, head = self.slots, self.budget, self.head
+        keep = 0
+        for i in range(self.count):
+            idx = (head + i) % n
+            p = slots[idx]
+            p.age += 1
+            if p.age >= p.life:
+                continue
+            p.x += p.vx
+            p.y += p.vy
+            if keep != i:
+                dst = (head + keep) % n
+                slots[dst], slots[idx] = p, slots[dst]
+            keep += 1
+        self.count = keep
+
+    def draw(self, surf):
+        """Blit every live particle; returns the rects that were touched."""
+        if not self.count:
+            return []
+        frames = self._frames()
+        slots, n, head = self.slots, self.budget, self.head
+        rings = []
+        texts = []
+        for i in range(self.count):
+            p = slots[(head + i) % n]
+            if p.kind == PARTICLE_RING:
+                img, half = frames[p.age]
+                rings.append((img, (p.x - half, p.y - half)))
+            elif p.kind == PARTICLE_TEXT:
+                fade = p.age - SCORE_FADE_START
+                alpha = 255 if fade <= 0 else int(255 * (1 - fade / (p.life - SCORE_FADE_START)))
+                if alpha <= 0:
+                    continue
+                # Outline for better visibility is baked into the cached surface
+                img = text_cache.render(p.label, SCORE_FONT, (*p.color, alpha),
+                                        outline=(0, 0, 0) if self.outline else None)
+                w, h = img.get_size()
+                texts.append((img, (p.x - w // 2, p.y - h // 2)))
+        # Labels stay on top of rings
+        rings.extend(texts)
+        return surf.blits(rings)
+
+    def stats(self):
+        slot_bytes = sys.getsizeof(self.slots[0]) if self.slots else 0
+        return {
+            "budget": self.budget,
+            "cap": self.cap,
+            "live": self.count,
+            "high_water": self.high_water,
+            "spawned": self.spawned,
+            "evicted": self.evicted,
+            "bytes_per_particle": slot_bytes,
+            "bytes": slot_bytes * self.budget + sys.getsizeof(self.slots),
+        }
@@ -0,0 +1,309 @@
+"""Gym-style environments around World for scripted and learned bots.
+
+    env = CovidEnv(seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(ACTION_FIRE)
+
+VectorEnv steps N independent worlds across worker processes; observations,
+rewards and done flags live in shared memory, so a step only sends one
+short command per worker. Both need numpy, like swarm mode.
+"""
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # the game itself does not need numpy
+    np = None
+
+from config import BASE_WIDTH, BASE_HEIGHT, FPS, GAME_DURATION, MAX_WAVES
+from world import World, Inputs, PLAYER_SPEED, EVENT_KILL, EVENT_PLAYER_HIT
+
+# Discrete actions -> (speedx, shots)
+ACTION_NOOP = 0
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_FIRE = 3
+ACTION_LEFT_FIRE = 4
+ACTION_RIGHT_FIRE = 5
+ACTIONS = [
+    Inputs(0, 0),
+    Inputs(-PLAYER_SPEED, 0),
+    Inputs(PLAYER_SPEED, 0),
+    Inputs(0, 1),
+    Inputs(-PLAYER_SPEED, 1),
+    Inputs(PLAYER_SPEED, 1),
+]
+
+# Observation: player x, life, hit cooldown, wave, live bullets,
+# then (dx, dy, speed) of the nearest enemies, zero padded
+OBS_ENEMIES = 8
+OBS_PLAYER = 5
+OBS_SIZE = OBS_PLAYER + 3 * OBS_ENEMIES
+MAX_BULLETS_OBS = 32
+
+REWARD_KILL = 1.0
+REWARD_HIT = -1.0
+
+MAX_EPISODE_TICKS = GAME_DURATION * FPS
+
+
+def _need_numpy():
+    if np is None:
+        raise RuntimeError("the bot environments need numpy: pip install numpy")
+
+
+# ======================================
+# SINGLE ENVIRONMENT
+# ======================================
+class CovidEnv:
+    """One World behind reset()/step(), with no window, audio or frame cap.
+
+    `frame_skip` repeats each action for that many ticks and sums the
+    rewards. Episodes end on game over (terminated) or after `max_ticks`
+    (truncated).
+    """
+
+    n_actions = len(ACTIONS)
+    observation_size = OBS_SIZE
+
+    def __init__(self, seed=None, frame_skip=1, max_ticks=MAX_EPISODE_TICKS):
+        _need_numpy()
+        self.world = World(seed)
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.obs = np.zeros(OBS_SIZE, np.float32)
+
+    def reset(self, seed=None):
+        self.world.reset(seed)
+        return self.observe(), self.info()
+
+    def step(self, action):
+        world = self.world
+        inputs = ACTIONS[action]
+        reward = 0.0
+        for _ in range(self.frame_skip):
+            for kind, _data in world.step(inputs):
+                if kind == EVENT_KILL:
+                    reward += REWARD_KILL
+                elif kind == EVENT_PLAYER_HIT:
+                    reward += REWARD_HIT
+            if world.game_over:
+                break
+        terminated = world.game_over
+        truncated = not terminated and world.tick >= self.max_ticks
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def observe(self, out=None):
+        """Write the observation into `out` (or an internal buffer) and return it."""
+        obs = self.obs if out is None else out
+        world = self.world
+        player = world.player
+        px, py = player.rect.center
+        obs[0] = px / BASE_WIDTH
+        obs[1] = player.life / 100
+        obs[2] = player.hit_cooldown / 60
+        obs[3] = world.current_wave / MAX_WAVES
+        obs[4] = min(len(world.cures), MAX_BULLETS_OBS) / MAX_BULLETS_OBS
+
+        near = sorted(
+            ((c.rect.centerx - px, c.rect.centery - py, c.speedy) for c in world.covids),
+            key=lambda e: e[0] * e[0] + e[1] * e[1],
+        )[:OBS_ENEMIES]
+        obs[OBS_PLAYER:] = 0
+        i = OBS_PLAYER
+        for dx, dy, vy in near:
+            obs[i] = dx / BASE_WIDTH
+            obs[i + 1] = dy / BASE_HEIGHT
+            obs[i + 2] = vy / 6
+            i += 3
+        return obs
+
+    def info(self):
+        world = self.world
+        return {"score": world.player.score, "life": world.player.life,
+                "wave": world.current_wave, "tick": world.tick}
+
+
+# ======================================
+# VECTOR ENVIRONMENT
+# ======================================
+def _worker(conn, shm_name, n_total, first, count, frame_skip, max_ticks):
+    """Runs envs [first, first + count) and writes results into shared memory."""
+    # Workers are always headless; set here, not at import, so importing env leaves SDL alone
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    shm = shared_memory.SharedMemory(name=shm_name)
+    bufs = _views(shm.buf, n_total)
+    obs, rewards, terminated, truncated, actions = bufs
+    envs = [CovidEnv(None, frame_skip, max_ticks) for _ in range(count)]
+    try:
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "reset":
+                for k, env in enumerate(envs):
+                    i = first + k
+                    env.reset(None if arg is None else arg + i)
+                    env.observe(obs[i])
+                conn.send(None)
+            elif cmd == "step":
+                finished = []
+                for k, env in enumerate(envs):
+                    i = first + k
+                    _, r, term, trunc, info = env.step(int(actions[i]))
+                    rewards[i] = r
+                    terminated[i] = term
+                    truncated[i] = trunc
+                    if term or trunc:
+                        # Auto-reset; the observation returned is the new episode's first
+                        finished.append((i, info))
+                        env.reset()
+                    env.observe(obs[i])
+                conn.send(finished)
+            elif cmd == "close":
+                break
+    finally:
+        del obs, rewards, terminated, truncated, actions, bufs
+        shm.close()
+        conn.close()
+
+
+def _layout(n):
+    """Byte offsets of the shared arrays: obs, rewards, terminated, truncated, actions."""
+    sizes = [n * OBS_SIZE * 4, n * 4, n, n, n * 4]
+    offsets = []
+    pos = 0
+    for size in sizes:
+        offsets.append(pos)
+        pos += (size + 7) & ~7
+    return offsets, pos
+
+
+def _views(buf, n):
+    offsets, _ = _layout(n)
+    return (
+        np.ndarray((n, OBS_SIZE), np.float32, buf, offsets[0]),
+        np.ndarray(n, np.float32, buf, offsets[1]),
+        np.ndarray(n, np.bool_, buf, offsets[2]),
+        np.ndarray(n, np.bool_, buf, offsets[3]),
+        np.ndarray(n, np.int32, buf, offsets[4]),
+    )
+
+
+class VectorEnv:
+    """N CovidEnvs split across `workers` processes, stepped in lockstep.
+
+    step(actions) returns (obs, rewards, terminated, truncated, infos) as
+    arrays over the N envs; `infos` maps env index -> final info for the
+    episodes that ended this step. Finished envs reset themselves, so obs
+    is always a live observation. The returned arrays are views of the
+    shared buffers and are overwritten by the next step; copy to keep them.
+    """
+
+    def __init__(self, n, seed=None, workers=None, frame_skip=1, max_ticks=MAX_EPISODE_TICKS):
+        _need_numpy()
+        self.n = n
+        self.seed = seed
+        workers = min(n, workers or os.cpu_count() or 1)
+        _, size = _layout(n)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.obs, self.rewards, self.terminated, self.truncated, self.actions = _views(self.shm.buf, n)
+
+        self.conns = []
+        self.procs = []
+        ctx = mp.get_context()
+        per, extra = divmod(n, workers)
+        first = 0
+        for w in range(workers):
+            count = per + (w < extra)
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_worker, daemon=True,
+                            args=(child, self.shm.name, n, first, count, frame_skip, max_ticks))
+            p.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(p)
+            first += count
+        self.closed = False
+
+    def reset(self, seed=None):
+        seed = self.seed if seed is None else seed
+        for conn in self.conns:
+            conn.send(("reset", seed))
+        for conn in self.conns:
+            conn.recv()
+        return self.obs
+
+    def step(self, actions):
+        self.actions[:] = actions
+        for conn in self.conns:
+            conn.send(("step", None))
+        infos = {}
+        for conn in self.conns:
+            for i, info in conn.recv():
+                infos[i] = info
+        return self.obs, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self.conns:
+            conn.send(("close", None))
+        for p in self.procs:
+            p.join()
+        del self.obs, self.rewards, self.terminated, self.truncated, self.actions
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ======================================
+# SCRIPTED BOT
+# ======================================
+def chase_policy(obs):
+    """Steer under the nearest enemy and fire when roughly lined up (batched)."""
+    dx = obs[:, OBS_PLAYER]
+    lined_up = np.abs(dx) < 0.03
+    return np.where(lined_up, ACTION_FIRE,
+                    np.where(dx < 0, ACTION_LEFT_FIRE, ACTION_RIGHT_FIRE)).astype(np.int32)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the scripted bot on N worlds in parallel")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    with VectorEnv(args.envs, seed=args.seed, workers=args.workers, frame_skip=args.frame_skip) as venv:
+        obs = venv.reset()
+        scores = []
+        t0 = time.perf_counter()
+        for _ in range(args.steps):
+            obs, rewards, terminated, truncated, infos = venv.step(chase_policy(obs))
+            scores.extend(info["score"] for info in infos.values())
+        seconds = time.perf_counter() - t0
+
+    ticks = args.envs * args.steps * args.frame_skip
+    print(f"{args.envs} envs on {len(venv.procs)} workers: {ticks} ticks in {seconds:.2f}s "
+          f"({ticks / seconds:.0f} ticks/s)")
+    if scores:
+        print(f"{len(scores)} episodes finished, mean score {sum(scores) / len(scores):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import time
+from collections import deque
+
+from config import FPS
+
+FRAME_BUDGET_MS = 1000 / FPS
+
+# Share of the budget the recent average must exceed to step down, or stay under to step up
+DOWN_RATIO = 0.95
+UP_RATIO = 0.6
+# Frames averaged before a decision; stepping up waits longer so levels do not flap
+DOWN_FRAMES = 30
+UP_FRAMES = 180
+# Frames ignored after a change while the new level settles
+SETTLE_FRAMES = 60
+HISTORY_SIZE = 32
+
+
+# ======================================
+# QUALITY LEVELS
+# ======================================
+class Quality:
+    """One rung of the quality ladder: every lever the governor can pull."""
+
+    __slots__ = ("name", "particles", "outline", "shake", "smooth", "text_every")
+
+    def __init__(self, name, particles, outline, shake, smooth, text_every):
+        self.name = name
+        self.particles = particles    # cap on live explosion rings and score labels
+        self.outline = outline        # outlined score labels (four extra text passes)
+        self.shake = shake            # screen shake on player hits
+        self.smooth = smooth          # smoothscale when the player chose --scale smooth
+        self.text_every = text_every  # one score label per this many kills
+
+    def __repr__(self):
+        return f"Quality({self.name!r})"
+
+
+# Cheapest-to-lose first: smoothscale is a full-frame filter, shake forces full presents
+QUALITY_LEVELS = (
+    Quality("high", particles=128, outline=True, shake=True, smooth=True, text_every=1),
+    Quality("medium", particles=96, outline=True, shake=True, smooth=False, text_every=1),
+    Quality("low", particles=64, outline=False, shake=True, smooth=False, text_every=2),
+    Quality("minimal", particles=32, outline=False, shake=False, smooth=False, text_every=4),
+)
+QUALITY_NAMES = tuple(q.name for q in QUALITY_LEVELS)
+
+
+# ======================================
+# GOVERNOR
+# ======================================
+class QualityGovernor:
+    """Steps quality down when frames miss the budget and back up when there is headroom.
+
+    Feed it the work time of every frame (excluding the vsync/tick wait).
+    It compares the average of the last DOWN_FRAMES against the budget to
+    step down quickly, and of the last UP_FRAMES to step up slowly. Every
+    change is kept in `history` as (time_s, frame, from, to, avg_ms) and
+    reported to `on_change(quality)`.
+    """
+
+    def __init__(self, levels=QUALITY_LEVELS, start=0, budget_ms=FRAME_BUDGET_MS,
+                 adaptive=True, on_change=None):
+        self.levels = levels
+        self.level = start
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.on_change = on_change
+        self.samples = deque(maxlen=UP_FRAMES)
+        self.settle = 0
+        self.frames = 0
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.origin = time.perf_counter()
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def apply(self):
+        """Push the current level to on_change (at startup and after set_level)."""
+        if self.on_change is not None:
+            self.on_change(self.quality)
+
+    def set_level(self, level, avg_ms=0.0):
+        level = max(0, min(len(self.levels) - 1, level))
+        if level == self.level:
+            return
+        self.history.append((round(time.perf_counter() - self.origin, 3), self.frames,
+                             self.levels[self.level].name, self.levels[level].name, round(avg_ms, 2)))
+        self.level = level
+        self.samples.clear()
+        self.settle = SETTLE_FRAMES
+        self.apply()
+
+    def update(self, work_ms):
+        self.frames += 1
+        if not self.adaptive:
+            return
+        if self.settle:
+            self.settle -= 1
+            return
+        samples = self.samples
+        samples.append(work_ms)
+
+        if len(samples) >= DOWN_FRAMES:
+            recent = sum(samples[i] for i in range(len(samples) - DOWN_FRAMES, len(samples))) / DOWN_FRAMES
+            if recent > self.budget_ms * DOWN_RATIO and self.level < len(self.levels) - 1:
+                self.set_level(self.level + 1, recent)
+                return
+        if len(samples) == UP_FRAMES and self.level > 0:
+            avg = sum(samples) / UP_FRAMES
+            if avg < self.budget_ms * UP_RATIO:
+                self.set_level(self.level - 1, avg)
+
+    def stats(self):
+        return {
+            "level": self.quality.name,
+            "adaptive": self.adaptive,
+            "changes": len(self.history),
+            "history": list(self.history),
+        }
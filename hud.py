@@ -0,0 +1,160 @@
+import pygame
+
+from config import BASE_WIDTH, MAX_WAVES
+from textcache import text_cache
+
+HUD_WIDTH = 200
+HUD_HEIGHT = 172
+HUD_TOP = 60
+HUD_FONT = 26
+
+# Inside the playfield when the window has no room beside it (e.g. --scale sdl)
+COMPACT_WIDTH = 150
+COMPACT_HEIGHT = 62
+COMPACT_MARGIN = 6
+COMPACT_FONT = 20
+
+LAYOUT_SIDE = "side"
+LAYOUT_COMPACT = "compact"
+
+
+# ======================================
+# WIDGETS
+# ======================================
+def draw_score(surf, value):
+    surf.blit(text_cache.render(f"Score: {value}", HUD_FONT, (0, 255, 255)), (0, 0))
+
+
+def draw_life(surf, value):
+    surf.blit(text_cache.render(f"HP: {value}", HUD_FONT, (0, 255, 255)), (0, 0))
+    pygame.draw.rect(surf, (255, 255, 255), (0, 30, 120, 12))
+    pygame.draw.rect(surf, (0, 255, 255), (0, 30, max(0, value), 12))
+
+
+def draw_wave(surf, value):
+    surf.blit(text_cache.render(f"Wave {value}/{MAX_WAVES}", HUD_FONT, (255, 255, 0)), (0, 0))
+    pygame.draw.rect(surf, (255, 255, 255), (0, 30, 120, 12))
+    pygame.draw.rect(surf, (255, 255, 0), (0, 30, int((value / MAX_WAVES) * 120), 12))
+
+
+def draw_score_compact(surf, value):
+    surf.blit(text_cache.render(f"Score {value}", COMPACT_FONT, (0, 255, 255)), (4, 0))
+
+
+def draw_life_compact(surf, value):
+    surf.blit(text_cache.render("HP", COMPACT_FONT, (0, 255, 255)), (4, 0))
+    pygame.draw.rect(surf, (255, 255, 255), (40, 6, 100, 8))
+    pygame.draw.rect(surf, (0, 255, 255), (40, 6, max(0, min(100, value)), 8))
+
+
+def draw_wave_compact(surf, value):
+    surf.blit(text_cache.render(f"Wave {value}/{MAX_WAVES}", COMPACT_FONT, (255, 255, 0)), (4, 0))
+
+
+# name -> (area inside the panel, draw(surf, value))
+DEFAULT_WIDGETS = {
+    "score": (pygame.Rect(0, 0, HUD_WIDTH, 40), draw_score),
+    "life": (pygame.Rect(0, 50, HUD_WIDTH, 42), draw_life),
+    "wave": (pygame.Rect(0, 130, HUD_WIDTH, 42), draw_wave),
+}
+
+COMPACT_WIDGETS = {
+    "score": (pygame.Rect(0, 0, COMPACT_WIDTH, 20), draw_score_compact),
+    "life": (pygame.Rect(0, 21, COMPACT_WIDTH, 20), draw_life_compact),
+    "wave": (pygame.Rect(0, 42, COMPACT_WIDTH, 20), draw_wave_compact),
+}
+
+# layout -> (panel size, widgets)
+LAYOUTS = {
+    LAYOUT_SIDE: ((HUD_WIDTH, HUD_HEIGHT), DEFAULT_WIDGETS),
+    LAYOUT_COMPACT: ((COMPACT_WIDTH, COMPACT_HEIGHT), COMPACT_WIDGETS),
+}
+
+
+# ======================================
+# HUD PANEL
+# ======================================
+class Hud:
+    """Score panel kept in one surface; a widget is redrawn only when its value changes.
+
+    Values arrive through World.subscribe(). Each frame costs a single blit
+    of the cached panel however many widgets there are; draw() returns that
+    blit as the one dirty rect, or None when nothing needed to be shown.
+    The panel sits beside the playfield when the window is wider than it,
+    otherwise a compact layout goes in the playfield's top-right corner.
+    """
+
+    def __init__(self, layouts=LAYOUTS):
+        self.layouts = {name: (size, dict(widgets)) for name, (size, widgets) in layouts.items()}
+        self.layout = None
+        self.widgets = {}
+        self.panel = None
+        self.values = {}
+        self.stale = set()
+        self.changed = True
+        self.redraws = 0
+        self.blits = 0
+
+    def add_widget(self, name, area, draw, layout=LAYOUT_SIDE):
+        self.layouts[layout][1][name] = (area, draw)
+        if name in self.values and layout == self.layout:
+            self.stale.add(name)
+
+    def _use(self, layout):
+        """Switch panel and widget table; every widget is redrawn into the new panel."""
+        size, self.widgets = self.layouts[layout]
+        self.layout = layout
+        self.panel = pygame.Surface(size)
+        self.panel.fill((0, 0, 0))
+        self.stale = set(self.values)
+
+    def attach(self, world):
+        world.subscribe(self.set)
+
+    def set(self, name, value):
+        if name not in self.values or self.values[name] != value:
+            self.values[name] = value
+            self.stale.add(name)
+
+    def _redraw(self):
+        for name in self.stale:
+            widget = self.widgets.get(name)
+            if widget is None:
+                continue
+            area, draw = widget
+            self.panel.fill((0, 0, 0), area)
+            draw(self.panel.subsurface(area), self.values[name])
+            self.redraws += 1
+        self.stale.clear()
+        self.changed = True
+
+    def placement(self, window):
+        """(layout, rect) of the panel in `window`."""
+        win_w, _ = window.get_size()
+        if win_w > BASE_WIDTH:
+            (w, h), _ = self.layouts[LAYOUT_SIDE]
+            return LAYOUT_SIDE, pygame.Rect(win_w - w, HUD_TOP, w, h)
+        (w, h), _ = self.layouts[LAYOUT_COMPACT]
+        return LAYOUT_COMPACT, pygame.Rect(win_w - w - COMPACT_MARGIN, COMPACT_MARGIN, w, h)
+
+    def rect(self, window):
+        """Where the panel goes in `window`."""
+        return self.placement(window)[1]
+
+    def draw(self, window, force=True):
+        """Blit the panel; with force=False only when a widget changed since the last blit."""
+        layout, area = self.placement(window)
+        if layout != self.layout:
+            self._use(layout)
+            force = True
+        if self.stale:
+            self._redraw()
+        if not (force or self.changed):
+            return None
+        self.changed = False
+        self.blits += 1
+        return window.blit(self.panel, area)
+
+    def stats(self):
+        return {"layout": self.layout, "widgets": len(self.widgets), "redraws": self.redraws,
+                "blits": self.blits}
@@ -0,0 +1,53 @@
+import pygame
+
+
+# ======================================
+# STATIC SCREEN CACHE
+# ======================================
+class ScreenCache:
+    """Composes a screen that only changes on input (menus, pause, game over).
+
+    A screen is a base layer, built once per visit (background, a frozen
+    gameplay frame, dimming, titles), plus a top layer that depends on a
+    small key such as the selected button. show() recomposes only when the
+    key changes and reports whether anything did, so the caller can skip
+    scaling and presenting unchanged frames.
+    """
+
+    def __init__(self, size):
+        self.base = pygame.Surface(size)
+        self.base_key = None
+        self.key = None
+        self.composes = 0
+        self.skipped = 0
+
+    def invalidate(self):
+        """Rebuild the base on the next show(), e.g. when the game state changes."""
+        self.base_key = None
+        self.key = None
+
+    def show(self, target, base_key, build_base, key, draw_top):
+        """build_base(surf) fills the base layer; draw_top(surf) draws over it."""
+        if base_key != self.base_key:
+            build_base(self.base)
+            self.base_key = base_key
+            self.key = None
+        if key == self.key:
+            self.skipped += 1
+            return False
+        target.blit(self.base, (0, 0))
+        draw_top(target)
+        self.key = key
+        self.composes += 1
+        return True
+
+    def stats(self):
+        return {"composes": self.composes, "skipped": self.skipped}
+
+
+def dim_overlay(size, alpha):
+    """Prebuilt translucent black layer for darkening a frozen frame."""
+    overlay = pygame.Surface(size)
+    overlay.set_alpha(alpha)
+    overlay.fill((0, 0, 0))
+    return overlay
@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+# ======================================
+# BACKGROUND LOADER
+# ======================================
+class BackgroundLoader:
+    """Runs a list of (label, job) callables on a daemon thread.
+
+    The jobs fill the shared asset caches, so once finished() reports a job's
+    label the main thread finds what it loaded already decoded. The main
+    loop keeps drawing and pumping events meanwhile and reads `progress`.
+    """
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.done = 0
+        self.finished_labels = set()
+        self.current = None
+        self.error = None
+        self.timings = []  # (label, ms)
+        self.thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        for label, job in self.jobs:
+            self.current = label
+            start = time.perf_counter()
+            try:
+                job()
+            except Exception as e:  # surfaced on the main thread by wait()/finished()
+                self.error = e
+                return
+            self.timings.append((label, (time.perf_counter() - start) * 1000))
+            self.finished_labels.add(label)
+            self.done += 1
+        self.current = None
+
+    def finished(self, *labels):
+        if self.error is not None:
+            raise self.error
+        return all(label in self.finished_labels for label in labels)
+
+    @property
+    def progress(self):
+        return self.done / len(self.jobs) if self.jobs else 1.0
+
+    def wait(self):
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+# ======================================
+# STARTUP TIMER
+# ======================================
+class StartupTimer:
+    """Milestones measured from `t0` (process start, taken before importing pygame)."""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.marks = []  # (name, ms since t0)
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.t0) * 1000))
+
+    def get(self, name):
+        for mark, ms in self.marks:
+            if mark == name:
+                return ms
+        return None
+
+    def report(self):
+        return "startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks)
@@ -0,0 +1,708 @@
+"""Co-op over UDP: an authoritative headless server and lightweight clients.
+
+    python net.py serve --players 2 --port 7777
+    python net.py bots 127.0.0.1:7777 --clients 2
+    python net.py loopback --clients 2 --ticks 1200 --loss 0.05
+
+The server runs CoopWorld single-threaded at a fixed tick and is the only
+place the simulation happens. Clients send one input per tick and receive
+snapshots. A snapshot always carries every player, but enemies and bullets
+are delta-encoded against the last snapshot the client acknowledged: each
+entity is sent with its velocity, and the client extrapolates entities it
+was not sent. An entity costs bytes only when it appears, disappears or
+leaves its straight-line path (a respawn, a kill), so bandwidth follows
+what changes rather than how many sprites exist. Snapshots also ack the
+client's last applied input so it can predict its own player between
+snapshots and reconcile when one arrives.
+
+`loopback` runs a server and bot clients in one thread over 127.0.0.1,
+checks every decoded client state against the server's, and prints the
+bandwidth and tick-time report.
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+
+import pygame
+
+from config import BASE_WIDTH, FPS
+from spatial import collide_groups
+from world import World, Player, Inputs, PLAYER_SPEED, EVENT_KILL, EVENT_PLAYER_HIT, EVENT_GAMEOVER
+
+DEFAULT_PORT = 7777
+MAX_DATAGRAM = 1200       # stays under common path MTUs
+SNAPSHOT_HISTORY = 64     # ticks of baselines kept on both ends
+MAX_INPUT_BUFFER = 4      # inputs queued per client before old ones are dropped
+MAX_SHOTS_PER_TICK = 1    # shots one input may fire; more are ignored
+CLIENT_TIMEOUT = 5.0      # seconds without packets before a client stops getting snapshots
+NO_BASE = 0xFFFFFFFF
+
+# Packet types (first byte)
+PKT_HELLO = 1
+PKT_WELCOME = 2
+PKT_INPUT = 3
+PKT_SNAPSHOT = 4
+PKT_BYE = 5
+PKT_FULL = 6
+
+PROTOCOL = b"CWN1"
+HELLO = struct.Struct("<B4s")            # type, protocol
+WELCOME = struct.Struct("<BBBHH")        # type, player index, players, tick rate, player width
+INPUT = struct.Struct("<BIIbB")          # type, input seq, acked snapshot tick, speedx, shots
+FRAGMENT = struct.Struct("<BIBB")        # type, tick, fragment index, fragment count
+SNAP_HEADER = struct.Struct("<IIIBBB")   # tick, base tick, input ack, wave, game over, players
+PLAYER = struct.Struct("<hhbhi")         # x, y, speedx, life, score
+COUNTS = struct.Struct("<HH")            # removed, changed
+REMOVED = struct.Struct("<H")            # entity id
+ENTITY = struct.Struct("<HBhhbb")        # id, kind, x, y, vx, vy
+
+# Entities a snapshot can carry and still fit 255 fragments, even if every one is removed and
+# replaced against its base; past that, bullets (then enemies) are left out of the snapshots
+MAX_FRAGMENTS = 255
+MAX_ENTITIES = ((MAX_FRAGMENTS * (MAX_DATAGRAM - FRAGMENT.size) - SNAP_HEADER.size - COUNTS.size
+                 - 255 * PLAYER.size) // (ENTITY.size + REMOVED.size))
+
+# Entity kinds
+KIND_COVID = 0
+KIND_CURE = 1
+
+
+# ======================================
+# CO-OP WORLD
+# ======================================
+class CoopWorld(World):
+    """World with several players against the same enemies.
+
+    step() takes one Inputs per player. Kills score for the player whose
+    bullet hit; the run ends when every player is out of life. players[0]
+    is also `world.player`, so single-player tools keep working.
+    """
+
+    def __init__(self, players=2, seed=None, broadphase=True, waves=None):
+        self.player_count = players
+        super().__init__(seed, broadphase, waves)
+
+    def reset(self, seed=None):
+        super().reset(seed)
+        self.players = [self.player]
+        for i in range(1, self.player_count):
+            self.players.append(Player())
+            self.allsprites.add(self.players[-1])
+        # Spread out along the bottom instead of stacked in the middle
+        for i, p in enumerate(self.players):
+            p.rect.centerx = BASE_WIDTH * (i + 1) // (self.player_count + 1)
+        self.publish_stats()
+
+    def checksum(self):
+        crc = super().checksum()
+        for p in self.players[1:]:
+            crc = zlib.crc32(struct.pack("<4i", p.score, p.life, p.hit_cooldown, p.rect.x), crc)
+        return crc
+
+    def shoot(self, owner=0):
+        p = self.players[owner]
+        b = self.cure_pool.acquire()
+        b.reset(p.rect.centerx, p.rect.top)
+        b.owner = owner
+        self.allsprites.add(b)
+        self.cures.add(b)
+        self.shots_fired += 1
+        return b
+
+    def apply_inputs(self, inputs):
+        if isinstance(inputs, Inputs):
+            inputs = (inputs,) * len(self.players)
+        for i, (p, inp) in enumerate(zip(self.players, inputs)):
+            if p.life <= 0:
+                continue
+            p.speedx = inp.speedx
+            for _ in range(inp.shots):
+                self.shoot(i)
+
+    def collide_bullets(self):
+        if self.grid is not None:
+            hits = collide_groups(self.grid, self.covids, self.cures, True, True)
+        else:
+            hits = pygame.sprite.groupcollide(self.covids, self.cures, True, True)
+        # Bullet lists come in grid order with the broadphase on; the lowest owner takes a shared
+        # kill so credit does not depend on it
+        kills = [(c.rect.center, min(getattr(b, "owner", 0) for b in bullets)) for c, bullets in hits.items()]
+        for center, owner in kills:
+            self.players[owner].score += 100
+            self.hits += 1
+            self.events.append((EVENT_KILL, center))
+            self.spawn_covid(self.wave_speed)
+
+    def collide_player(self):
+        for p in self.players:
+            if p.life <= 0 or p.hit_cooldown:
+                continue
+            if pygame.sprite.spritecollideany(p, self.covids):
+                p.life -= 10
+                p.hit_cooldown = 60
+                self.events.append((EVENT_PLAYER_HIT, p.rect.center))
+                if p.life <= 0:
+                    p.kill()  # out of the run; the others keep playing
+        if all(p.life <= 0 for p in self.players):
+            self.game_over = True
+            self.events.append((EVENT_GAMEOVER, sum(p.score for p in self.players)))
+
+
+# ======================================
+# SNAPSHOTS
+# ======================================
+class EntityIds:
+    """Small stable ids for sprites, recycled once a sprite leaves the world."""
+
+    def __init__(self):
+        self.ids = {}
+        self.free = []
+        self.next_id = 0
+
+    def assign(self, sprites):
+        """Id for every sprite in `sprites` (in order); forgets sprites no longer present."""
+        old, ids = self.ids, {}
+        for s in sprites:
+            eid = old.pop(s, None)
+            if eid is None:
+                if self.free:
+                    eid = self.free.pop()
+                else:
+                    eid = self.next_id
+                    self.next_id += 1
+            ids[s] = eid
+        self.free.extend(old.values())
+        self.ids = ids
+        return ids
+
+
+def capture(world, ids, limit=MAX_ENTITIES):
+    """Entity state of one tick: {id: (kind, x, y, vx, vy)} in integer pixels.
+
+    At most `limit` entities, enemies first: bullets are the first to be left out.
+    """
+    state = {}
+    covids = world.covids.sprites()[:limit]
+    cures = world.cures.sprites()[:limit - len(covids)]
+    sid = ids.assign(covids + cures)
+    for c in covids:
+        state[sid[c]] = (KIND_COVID, c.rect.x, c.rect.y, 0, c.speedy)
+    for b in cures:
+        # Rotation changes a bullet's rect size, its center moves in a straight line
+        x, y = b.rect.center
+        state[sid[b]] = (KIND_CURE, x, y, 0, b.speedy)
+    return state
+
+
+def extrapolate(entity, dt):
+    kind, x, y, vx, vy = entity
+    return (kind, x + vx * dt, y + vy * dt, vx, vy)
+
+
+def encode_snapshot(tick, state, base_tick, base, input_ack, world):
+    """Snapshot bytes: every player, then entities that differ from `base` moved on to `tick`."""
+    players = world.players
+    out = [SNAP_HEADER.pack(tick, base_tick, input_ack, world.current_wave, world.game_over, len(players))]
+    for p in players:
+        out.append(PLAYER.pack(p.rect.x, p.rect.y, p.speedx, p.life, p.score))
+
+    dt = tick - base_tick
+    removed = [eid for eid in base if eid not in state]
+    changed = []
+    for eid, entity in state.items():
+        old = base.get(eid)
+        if old is None or extrapolate(old, dt) != entity:
+            changed.append(ENTITY.pack(eid, *entity))
+    out.append(COUNTS.pack(len(removed), len(changed)))
+    out.extend(REMOVED.pack(eid) for eid in removed)
+    out.extend(changed)
+    return b"".join(out), len(changed)
+
+
+def decode_snapshot(data, bases):
+    """(header, players, state) from snapshot bytes; None when its base is not in `bases`."""
+    tick, base_tick, input_ack, wave, game_over, count = SNAP_HEADER.unpack_from(data)
+    if base_tick == NO_BASE:
+        base = {}
+    else:
+        base = bases.get(base_tick)
+        if base is None:
+            return None
+    offset = SNAP_HEADER.size
+    players = []
+    for i in range(count):
+        players.append(PLAYER.unpack_from(data, offset))
+        offset += PLAYER.size
+    removed, changed = COUNTS.unpack_from(data, offset)
+    offset += COUNTS.size
+
+    dt = tick - base_tick
+    state = {eid: extrapolate(e, dt) for eid, e in base.items()}
+    for i in range(removed):
+        state.pop(REMOVED.unpack_from(data, offset)[0], None)
+        offset += REMOVED.size
+    for i in range(changed):
+        eid, *entity = ENTITY.unpack_from(data, offset)
+        state[eid] = tuple(entity)
+        offset += ENTITY.size
+    header = {"tick": tick, "base": base_tick, "input_ack": input_ack, "wave": wave, "game_over": bool(game_over)}
+    return header, players, state
+
+
+def fragment(tick, payload):
+    """Split a snapshot into datagrams of at most MAX_DATAGRAM bytes."""
+    size = MAX_DATAGRAM - FRAGMENT.size
+    chunks = [payload[i:i + size] for i in range(0, len(payload), size)] or [b""]
+    if len(chunks) > MAX_FRAGMENTS:  # capture() keeps snapshots under this
+        raise ValueError(f"snapshot of {len(payload)} bytes needs more than {MAX_FRAGMENTS} fragments")
+    return [FRAGMENT.pack(PKT_SNAPSHOT, tick, i, len(chunks)) + c for i, c in enumerate(chunks)]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    v = sorted(values)
+    return v[min(len(v) - 1, int(round(p / 100 * (len(v) - 1))))]
+
+
+# ======================================
+# SERVER
+# ======================================
+class RemotePlayer:
+    """Server-side view of one connected client."""
+
+    def __init__(self, index, address):
+        self.index = index
+        self.address = address
+        self.inputs = deque()
+        self.last_seq = 0       # newest input applied
+        self.speedx = 0         # held between inputs, like a held key
+        self.acked = NO_BASE    # newest snapshot the client decoded
+        self.last_seen = time.perf_counter()
+        self.bytes_out = 0
+        self.snapshots = 0
+        self.full = 0
+
+
+class Server:
+    """Authoritative simulation; call tick() at a fixed rate (run() does the pacing)."""
+
+    def __init__(self, address=("0.0.0.0", DEFAULT_PORT), players=2, seed=None, hz=FPS, loss=0.0):
+        self.world = CoopWorld(players, seed)
+        self.players = players
+        self.hz = hz
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+        self.clients = {}  # address -> RemotePlayer
+        self.seen = []     # every client that joined, for the report
+        self.ids = EntityIds()
+        self.history = {}  # tick -> captured state, last SNAPSHOT_HISTORY ticks
+        # Dropping outgoing datagrams on purpose tests the delta fallback over loopback
+        self.loss = loss
+        self.loss_rng = random.Random(seed)
+        self.tick_ms = []
+        self.bytes_in = 0
+        self.entities = 0
+        self.entities_sent = 0
+        self.entities_capped = 0
+        self.dropped = 0
+
+    @property
+    def started(self):
+        return len(self.clients) == self.players
+
+    def send(self, data, address):
+        if self.loss and self.loss_rng.random() < self.loss:
+            self.dropped += 1
+            return 0
+        self.sock.sendto(data, address)
+        return len(data)
+
+    def poll(self):
+        """Handle every datagram waiting on the socket."""
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:  # Windows reports ICMP port unreachable here
+                continue
+            self.bytes_in += len(data)
+            if not data:
+                continue
+            client = self.clients.get(address)
+            if client is not None:
+                client.last_seen = time.perf_counter()
+            kind = data[0]
+            if kind == PKT_HELLO and len(data) == HELLO.size:
+                self.on_hello(address, HELLO.unpack(data)[1])
+            elif kind == PKT_INPUT and client is not None and len(data) == INPUT.size:
+                _, seq, ack, speedx, shots = INPUT.unpack(data)
+                # Clients only ask; they cannot move faster or fire more than a local player
+                speedx = max(-PLAYER_SPEED, min(PLAYER_SPEED, speedx))
+                shots = min(shots, MAX_SHOTS_PER_TICK)
+                if ack != NO_BASE and (client.acked == NO_BASE or ack > client.acked):
+                    client.acked = ack
+                if seq > client.last_seq and (not client.inputs or seq > client.inputs[-1][0]):
+                    client.inputs.append((seq, speedx, shots))
+                    if len(client.inputs) > MAX_INPUT_BUFFER:
+                        client.inputs.popleft()
+            elif kind == PKT_BYE and client is not None:
+                del self.clients[address]
+
+    def on_hello(self, address, protocol):
+        if protocol != PROTOCOL:
+            return
+        client = self.clients.get(address)
+        if client is None:
+            taken = {c.index for c in self.clients.values()}
+            free = [i for i in range(self.players) if i not in taken]
+            if not free:
+                self.send(bytes([PKT_FULL]), address)
+                return
+            client = self.clients[address] = RemotePlayer(free[0], address)
+            self.seen.append(client)
+        # Sent again for a repeated HELLO: the first WELCOME may have been lost
+        width = self.world.players[client.index].rect.width
+        self.send(WELCOME.pack(PKT_WELCOME, client.index, self.players, self.hz, width), address)
+
+    def tick(self):
+        """Read inputs, step the world once and send each client its snapshot."""
+        self.poll()
+        if not self.started or self.world.game_over:
+            return False
+        start = time.perf_counter()
+
+        inputs = [Inputs() for _ in range(self.players)]
+        for client in self.clients.values():
+            shots = 0
+            if client.inputs:
+                client.last_seq, client.speedx, shots = client.inputs.popleft()
+            inputs[client.index] = Inputs(client.speedx, shots)
+        self.world.step(inputs)
+
+        tick = self.world.tick
+        state = self.history[tick] = capture(self.world, self.ids)
+        self.history.pop(tick - SNAPSHOT_HISTORY, None)
+        self.entities += len(state)
+        self.entities_capped += len(self.world.covids) + len(self.world.cures) - len(state)
+
+        now = time.perf_counter()
+        for client in self.clients.values():
+            if now - client.last_seen > CLIENT_TIMEOUT:
+                continue
+            base = self.history.get(client.acked)
+            if base is None:
+                base_tick, base = NO_BASE, {}
+                client.full += 1
+            else:
+                base_tick = client.acked
+            payload, sent = encode_snapshot(tick, state, base_tick, base, client.last_seq, self.world)
+            self.entities_sent += sent
+            for datagram in fragment(tick, payload):
+                client.bytes_out += self.send(datagram, client.address)
+            client.snapshots += 1
+        self.tick_ms.append((time.perf_counter() - start) * 1000)
+        return True
+
+    def run(self, ticks=None):
+        """Tick at `hz` until the run ends (or for `ticks` ticks)."""
+        period = 1 / self.hz
+        next_time = time.perf_counter()
+        done = 0
+        while ticks is None or done < ticks:
+            if self.tick():
+                done += 1
+            elif self.world.game_over:
+                break
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()  # behind: do not try to catch up in a burst
+
+    def report(self):
+        ticks = len(self.tick_ms)
+        snapshots = sum(c.snapshots for c in self.seen)
+        lines = [
+            f"server: {ticks} ticks, {self.players} players, tick p50 {percentile(self.tick_ms, 50):.3f} ms "
+            f"p95 {percentile(self.tick_ms, 95):.3f} ms max {max(self.tick_ms, default=0):.3f} ms",
+            f"entities: {self.entities / max(ticks, 1):.0f} per tick, "
+            f"{self.entities_sent / max(snapshots, 1):.1f} sent per snapshot "
+            f"(every entity every tick would be {self.entities / max(ticks, 1) * ENTITY.size:.0f} B/tick)",
+        ]
+        if self.entities_capped:
+            lines.append(f"capped: {self.entities_capped} entity-ticks left out to keep snapshots "
+                         f"under {MAX_FRAGMENTS} fragments")
+        for client in self.seen:
+            per_tick = client.bytes_out / max(client.snapshots, 1)
+            lines.append(f"player {client.index}: {client.snapshots} snapshots ({client.full} full), "
+                         f"{per_tick:.0f} B/tick, {per_tick * self.hz * 8 / 1000:.1f} kbit/s")
+        lines.append(f"in: {self.bytes_in} B total, {self.bytes_in / max(snapshots, 1):.0f} B/tick per client" + (f"; {self.dropped} datagrams dropped on purpose" if self.loss else ""))
+        return "\n".join(lines)
+
+    def close(self):
+        self.sock.close()
+
+
+# ======================================
+# CLIENT
+# ======================================
+class Client:
+    """Sends inputs, rebuilds the world from snapshots and predicts its own player."""
+
+    def __init__(self, server_address):
+        host, port = server_address
+        # Resolved once so replies can be matched against recvfrom()'s address
+        self.server = (socket.gethostbyname(host), port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("", 0))
+        self.sock.setblocking(False)
+        self.index = None
+        self.players_total = 0
+        self.player_width = 0
+        self.seq = 0
+        self.pending = deque()   # (seq, speedx) not yet acked by a snapshot
+        self.fragments = {}      # tick -> list of chunks
+        self.bases = {}          # tick -> decoded entity state
+        self.tick = NO_BASE
+        self.header = None
+        self.players = []
+        self.state = {}
+        self.predicted_x = None
+        self.snapshots = 0
+        self.undecodable = 0
+        self.malformed = 0
+        self.mispredictions = 0
+        self.bytes_in = 0
+
+    def connect(self, timeout=5.0, pump=None):
+        """Send HELLO until WELCOME; `pump()` lets a loopback server run in the same thread."""
+        deadline = time.perf_counter() + timeout
+        while self.index is None:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"no answer from {self.server[0]}:{self.server[1]}")
+            self.sock.sendto(HELLO.pack(PKT_HELLO, PROTOCOL), self.server)
+            if pump is not None:
+                pump()
+            else:
+                time.sleep(0.05)
+            self.poll()
+        return self.index
+
+    def send_input(self, speedx, shots=0):
+        self.seq += 1
+        self.pending.append((self.seq, speedx))
+        # Predict right away instead of waiting a round trip to see the player move
+        if self.predicted_x is not None:
+            self.predicted_x = self.move(self.predicted_x, speedx)
+        self.sock.sendto(INPUT.pack(PKT_INPUT, self.seq, self.tick, speedx, shots), self.server)
+
+    def move(self, x, speedx):
+        # Player.update: move, then clamp to the screen
+        return max(0, min(BASE_WIDTH - self.player_width, x + speedx))
+
+    def poll(self):
+        """Read every waiting datagram; returns True if a new snapshot was decoded."""
+        got = False
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return got
+            except ConnectionResetError:
+                continue
+            if address != self.server:
+                continue
+            self.bytes_in += len(data)
+            kind = data[0] if data else None
+            if kind == PKT_WELCOME and len(data) == WELCOME.size:
+                _, self.index, self.players_total, _, self.player_width = WELCOME.unpack(data)
+            elif kind == PKT_FULL and len(data) == 1:
+                raise ConnectionRefusedError("server is full")
+            elif kind == PKT_SNAPSHOT and len(data) >= FRAGMENT.size:
+                _, tick, i, count = FRAGMENT.unpack_from(data)
+                if self.tick != NO_BASE and tick <= self.tick:
+                    continue  # late or duplicate
+                chunks = self.fragments.setdefault(tick, [None] * count)
+                if i >= len(chunks):
+                    self.malformed += 1  # fragment index or count disagrees with the others
+                    continue
+                chunks[i] = data[FRAGMENT.size:]
+                if None not in chunks:
+                    del self.fragments[tick]
+                    got = self.on_snapshot(b"".join(chunks)) or got
+            else:
+                self.malformed += 1
+
+    def on_snapshot(self, payload):
+        try:
+            decoded = decode_snapshot(payload, self.bases)
+        except struct.error:  # truncated or corrupt payload
+            self.malformed += 1
+            return False
+        if decoded is None:
+            self.undecodable += 1
+            return False
+        header, players, state = decoded
+        if self.index is None or self.index >= len(players):
+            self.malformed += 1
+            return False
+        tick = header["tick"]
+        self.header, self.players, self.state, self.tick = header, players, state, tick
+        self.bases[tick] = state
+        # Snapshots arrive with gaps, so drop every base that fell out of the window
+        for old in [t for t in self.bases if t <= tick - SNAPSHOT_HISTORY]:
+            del self.bases[old]
+        for old in [t for t in self.fragments if t <= tick]:
+            del self.fragments[old]
+        self.snapshots += 1
+        self.reconcile(header["input_ack"])
+        return True
+
+    def reconcile(self, input_ack):
+        """Restart prediction from the server's player and replay inputs it has not seen."""
+        pending = self.pending
+        while pending and pending[0][0] <= input_ack:
+            pending.popleft()
+        x = self.players[self.index][0]
+        for seq, speedx in pending:
+            x = self.move(x, speedx)
+        if self.predicted_x is not None and x != self.predicted_x:
+            self.mispredictions += 1
+        self.predicted_x = x
+
+    def bye(self):
+        self.sock.sendto(bytes([PKT_BYE]), self.server)
+
+    def close(self):
+        self.sock.close()
+
+
+# ======================================
+# BOTS
+# ======================================
+def bot_input(client, tick):
+    """Steer under the nearest enemy and fire every fourth tick."""
+    if client.predicted_x is None:
+        return 0, 0
+    center = client.predicted_x + client.player_width // 2
+    best = None
+    for kind, x, y, vx, vy in client.state.values():
+        if kind == KIND_COVID and y > 0 and (best is None or y > best[1]):
+            best = (x + 15, y)
+    speedx = 0
+    if best is not None and abs(best[0] - center) > PLAYER_SPEED:
+        speedx = PLAYER_SPEED if best[0] > center else -PLAYER_SPEED
+    return speedx, 1 if tick % 4 == 0 else 0
+
+
+def run_loopback(clients=2, ticks=1200, seed=1, loss=0.0, enemies=0, verify=True):
+    """Server and bots in one thread over 127.0.0.1; returns (server, clients, mismatches)."""
+    server = Server(("127.0.0.1", 0), players=clients, seed=seed, loss=loss)
+    # Extra enemies on top of the waves, to see how bandwidth scales with entity count
+    for _ in range(enemies):
+        server.world.spawn_covid()
+    bots = [Client(server.address) for _ in range(clients)]
+    for bot in bots:
+        bot.connect(pump=server.poll)
+    mismatches = 0
+    for t in range(ticks):
+        for bot in bots:
+            bot.send_input(*bot_input(bot, t))
+        if not server.tick():
+            break
+        for bot in bots:
+            if bot.poll() and verify and bot.tick == server.world.tick:
+                if bot.state != server.history[bot.tick]:
+                    mismatches += 1
+    return server, bots, mismatches
+
+
+def stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="mode", required=True)
+    serve = sub.add_parser("serve", help="run the authoritative server")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--players", type=int, default=2)
+    serve.add_argument("--seed", type=int)
+    bots = sub.add_parser("bots", help="connect scripted bot clients to a server")
+    bots.add_argument("server", metavar="HOST:PORT")
+    bots.add_argument("--clients", type=int, default=1)
+    bots.add_argument("--ticks", type=int, default=3600)
+    loop = sub.add_parser("loopback", help="server plus bots in one process, with a report")
+    loop.add_argument("--clients", type=int, default=2)
+    loop.add_argument("--ticks", type=int, default=1200)
+    loop.add_argument("--seed", type=int, default=1)
+    loop.add_argument("--loss", type=float, default=0.0, help="share of server datagrams to drop")
+    loop.add_argument("--enemies", type=int, default=0, help="extra enemies on top of the waves")
+    args = parser.parse_args(argv)
+
+    # Set here, not at import: importing net for CoopWorld or Client leaves SDL alone
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if args.mode == "serve":
+        server = Server((args.host, args.port), args.players, args.seed)
+        print(f"serving {args.players} players on {server.address[0]}:{server.address[1]}")
+        # Ctrl-C or a service manager's SIGTERM both end with the report
+        signal.signal(signal.SIGTERM, stop_on_sigterm)
+        try:
+            server.run()
+        except KeyboardInterrupt:
+            pass
+        print(server.report())
+        server.close()
+        return 0
+
+    if args.mode == "bots":
+        host, port = args.server.rsplit(":", 1)
+        clients = [Client((host, int(port))) for _ in range(args.clients)]
+        for c in clients:
+            print(f"connected as player {c.connect()}")
+        period = 1 / FPS
+        for t in range(args.ticks):
+            for c in clients:
+                c.send_input(*bot_input(c, t))
+                c.poll()
+            if any(c.header and c.header["game_over"] for c in clients):
+                break
+            time.sleep(period)
+        for c in clients:
+            print(f"player {c.index}: {c.snapshots} snapshots, {c.undecodable} undecodable, "
+                  f"{c.malformed} malformed, {c.mispredictions} mispredictions, {c.bytes_in} B in")
+            c.bye()
+            c.close()
+        return 0
+
+    t0 = time.perf_counter()
+    server, clients, mismatches = run_loopback(args.clients, args.ticks, args.seed, args.loss, args.enemies)
+    seconds = time.perf_counter() - t0
+    print(server.report())
+    for c in clients:
+        print(f"client {c.index}: {c.snapshots} snapshots decoded, {c.undecodable} undecodable, "
+              f"{c.malformed} malformed, {c.mispredictions} mispredictions")
+    print(f"{len(server.tick_ms)} ticks in {seconds:.2f}s; "
+          f"{'state matched the server on every decoded tick' if not mismatches else f'{mismatches} MISMATCHED ticks'}")
+    server.close()
+    for c in clients:
+        c.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
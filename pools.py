@@ -0,0 +1,62 @@
+# ======================================
+# OBJECT POOL
+# ======================================
+class Pool:
+    """Free list of reusable objects with a fixed capacity.
+
+    acquire() hands out a free object, or builds one while fewer than
+    `capacity` exist. When the pool is exhausted it returns None, unless
+    `overflow` is set: then it builds a temporary object anyway (gameplay
+    entities must not silently fail to spawn) and counts the overflow.
+    The caller resets whatever state it needs on the returned object.
+    """
+
+    def __init__(self, factory, capacity, overflow=False):
+        self.factory = factory
+        self.capacity = capacity
+        self.overflow = overflow
+        self.free = []
+        self.created = 0
+        self.in_use = 0
+        self.high_water = 0
+        self.exhausted = 0
+        self.overflowed = 0
+
+    def prewarm(self, n):
+        """Build up to `n` free objects now so acquire() does not allocate later."""
+        while len(self.free) < n and self.created < self.capacity:
+            self.free.append(self.factory())
+            self.created += 1
+
+    def acquire(self):
+        if self.free:
+            obj = self.free.pop()
+        elif self.created < self.capacity:
+            obj = self.factory()
+            self.created += 1
+        else:
+            self.exhausted += 1
+            if not self.overflow:
+                return None
+            obj = self.factory()
+            self.overflowed += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "created": self.created,
+            "in_use": self.in_use,
+            "free": len(self.free),
+            "high_water": self.high_water,
+            "exhausted": self.exhausted,
+            "overflowed": self.overflowed,
+        }
@@ -0,0 +1,160 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+from config import FPS
+from textcache import text_cache
+
+FRAME_BUDGET_MS = 1000 / FPS
+CAPTURE_FRAMES = 600  # 10 seconds at 60 FPS
+GRAPH_FRAMES = 120
+BAR_AVERAGE_FRAMES = 30
+
+# Phases are not counted as work in the graph
+IDLE_PHASES = ("wait",)
+
+PHASE_COLORS = [
+    (0, 200, 255), (255, 200, 0), (0, 255, 120), (255, 90, 90), (200, 120, 255),
+    (255, 150, 50), (120, 220, 220), (255, 255, 255), (160, 255, 0), (255, 100, 200),
+    (120, 160, 255), (200, 200, 120),
+]
+
+
+# ======================================
+# FRAME PROFILER
+# ======================================
+class FrameProfiler:
+    """Times named phases of each frame and keeps a rolling capture.
+
+    The loop calls begin_frame(), then mark(phase) after each phase and
+    end_frame() at the end. While disabled every call returns immediately.
+    """
+
+    def __init__(self, capture=CAPTURE_FRAMES):
+        self.enabled = False
+        self.frames = deque(maxlen=capture)  # (frame_no, start_s, [(phase, start_s, dur_ms)])
+        self.phase_order = []
+        self.frame_no = 0
+        self.origin = time.perf_counter()
+        self._phases = None
+        self._frame_start = 0.0
+        self._last = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._phases = None
+        return self.enabled
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._phases = []
+
+    def mark(self, phase):
+        if self._phases is None:
+            return
+        now = time.perf_counter()
+        self._phases.append((phase, self._last, (now - self._last) * 1000))
+        self._last = now
+        if phase not in self.phase_order:
+            self.phase_order.append(phase)
+
+    def end_frame(self):
+        if self._phases is None:
+            return
+        self.frames.append((self.frame_no, self._frame_start, self._phases))
+        self.frame_no += 1
+        self._phases = None
+
+    # ---------- queries ----------
+    def work_ms(self, phases):
+        return sum(dur for name, start, dur in phases if name not in IDLE_PHASES)
+
+    def averages(self, frames=BAR_AVERAGE_FRAMES):
+        recent = list(self.frames)[-frames:]
+        totals = dict.fromkeys(self.phase_order, 0.0)
+        for _, _, phases in recent:
+            for name, start, dur in phases:
+                totals[name] += dur
+        n = max(1, len(recent))
+        return [(name, totals[name] / n) for name in self.phase_order]
+
+    # ---------- overlay ----------
+    def draw(self, surf, pos=(10, 10)):
+        if not self.enabled or not self.frames:
+            return
+        x, y = pos
+        graph_w, graph_h = GRAPH_FRAMES * 2, 60
+        panel = pygame.Rect(x, y, graph_w + 20, graph_h + 40 + 18 * len(self.phase_order))
+        shade = pygame.Surface(panel.size, pygame.SRCALPHA)
+        shade.fill((0, 0, 0, 170))
+        surf.blit(shade, panel)
+
+        # Rolling frame-time graph, scaled so two budgets fill the height
+        gx, gy = x + 10, y + 10
+        scale = graph_h / (FRAME_BUDGET_MS * 2)
+        budget_y = gy + graph_h - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(surf, (255, 60, 60), (gx, budget_y), (gx + graph_w, budget_y))
+        recent = list(self.frames)[-GRAPH_FRAMES:]
+        for i, (_, _, phases) in enumerate(recent):
+            ms = self.work_ms(phases)
+            h = min(graph_h, int(ms * scale))
+            color = (0, 255, 120) if ms <= FRAME_BUDGET_MS else (255, 80, 80)
+            pygame.draw.line(surf, color, (gx + i * 2, gy + graph_h), (gx + i * 2, gy + graph_h - h))
+
+        last_ms = self.work_ms(recent[-1][2])
+        label = text_cache.render(f"frame {last_ms:5.2f} ms  budget {FRAME_BUDGET_MS:.1f}", 14, (255, 255, 255))
+        surf.blit(label, (gx, gy + graph_h + 4))
+
+        # Per-phase bars averaged over the last few frames
+        by = gy + graph_h + 24
+        for i, (name, ms) in enumerate(self.averages()):
+            color = PHASE_COLORS[i % len(PHASE_COLORS)]
+            w = min(graph_w - 150, int(ms / FRAME_BUDGET_MS * (graph_w - 150)))
+            pygame.draw.rect(surf, color, (gx + 150, by + 4, max(1, w), 10))
+            surf.blit(text_cache.render(name, 14, color), (gx, by))
+            surf.blit(text_cache.render(f"{ms:.2f}", 14, color), (gx + 100, by))
+            by += 18
+
+    # ---------- export ----------
+    def export_chrome_trace(self, path):
+        """Chrome trace-event JSON, viewable in chrome://tracing or Perfetto."""
+        events = []
+        for frame_no, start, phases in self.frames:
+            events.append({
+                "name": f"frame {frame_no}", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self.origin) * 1e6, "dur": sum(d for _, _, d in phases) * 1000,
+            })
+            for name, phase_start, dur in phases:
+                events.append({
+                    "name": name, "ph": "X", "pid": 1, "tid": 1,
+                    "ts": (phase_start - self.origin) * 1e6, "dur": dur * 1000,
+                })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path):
+        """One row per frame, one column per phase, in milliseconds."""
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["frame", "start_ms"] + self.phase_order + ["work_ms"])
+            for frame_no, start, phases in self.frames:
+                row = dict.fromkeys(self.phase_order, 0.0)
+                for name, _, dur in phases:
+                    row[name] += dur
+                w.writerow([frame_no, f"{(start - self.origin) * 1000:.3f}"]
+                           + [f"{row[n]:.4f}" for n in self.phase_order]
+                           + [f"{self.work_ms(phases):.4f}"])
+
+    def export(self, stem):
+        """Write <stem>.json (Chrome trace) and <stem>.csv; returns both paths."""
+        self.export_chrome_trace(stem + ".json")
+        self.export_csv(stem + ".csv")
+        return stem + ".json", stem + ".csv"
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,206 @@
+import math
+
+import pygame
+
+from config import BASE_WIDTH, BASE_HEIGHT
+
+WINDOW_SIZE = (1200, 800)
+
+SCALE_NEAREST = "nearest"
+SCALE_SMOOTH = "smooth"
+SCALE_INTEGER = "integer"
+SCALE_SDL = "sdl"
+SCALE_MODES = (SCALE_NEAREST, SCALE_SMOOTH, SCALE_INTEGER, SCALE_SDL)
+
+# Above this share of the game surface a single full present is cheaper
+FULL_PRESENT_RATIO = 0.5
+
+
+# ======================================
+# LETTERBOX LAYOUT
+# ======================================
+def letterbox(win_size, integer=False):
+    """(scale, x, y, w, h) that fits the game surface centered in the window."""
+    win_w, win_h = win_size
+    scale = min(win_w / BASE_WIDTH, win_h / BASE_HEIGHT)
+    if integer and scale >= 1:
+        scale = math.floor(scale)
+    new_w = int(BASE_WIDTH * scale)
+    new_h = int(BASE_HEIGHT * scale)
+    return scale, (win_w - new_w) // 2, (win_h - new_h) // 2, new_w, new_h
+
+
+# ======================================
+# PRESENTER
+# ======================================
+class Presenter:
+    """Owns the window and puts the game surface on it.
+
+    The letterbox layout and the scaled destination surface are only rebuilt
+    when the window size changes; every frame scales into the same surface.
+    Screen shake is an offset applied when blitting, never a re-scale.
+    """
+
+    def __init__(self, mode=SCALE_NEAREST):
+        if mode not in SCALE_MODES:
+            raise ValueError(f"unknown scale mode {mode!r}, expected one of {SCALE_MODES}")
+        self.mode = mode
+        self.window = None
+        self.win_size = None
+        self.layout = None
+        self.dest = None
+        self.last_offset = (0, 0)
+        self.needs_clear = True
+        self.resizes = 0
+
+    def open_window(self, size=WINDOW_SIZE):
+        if self.mode == SCALE_SDL:
+            # SDL scales the logical 600x800 surface itself (GPU where available)
+            self.window = pygame.display.set_mode((BASE_WIDTH, BASE_HEIGHT), pygame.SCALED | pygame.RESIZABLE)
+        else:
+            self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.resize()
+        return self.window
+
+    def resize(self):
+        """Recompute layout and reallocate the scale target; call on VIDEORESIZE."""
+        self.window = pygame.display.get_surface()
+        self.win_size = self.window.get_size()
+        self.resizes += 1
+        if self.mode == SCALE_SDL:
+            self.layout = (1, 0, 0, BASE_WIDTH, BASE_HEIGHT)
+            self.dest = None
+        else:
+            self.layout = letterbox(self.win_size, integer=self.mode == SCALE_INTEGER)
+            _, _, _, new_w, new_h = self.layout
+            self.dest = pygame.Surface((max(1, new_w), max(1, new_h))).convert()
+        self.needs_clear = True
+
+    def invalidate(self):
+        """Clear the whole window on the next present (something drew over the bars)."""
+        self.needs_clear = True
+
+    def _scale_into(self, src, dest):
+        if self.mode == SCALE_SMOOTH:
+            pygame.transform.smoothscale(src, dest.get_size(), dest)
+        else:
+            pygame.transform.scale(src, dest.get_size(), dest)
+
+    def present(self, surf, offset=(0, 0)):
+        """Scale the whole game surface into the window at the letterbox position."""
+        if self.window.get_size() != self.win_size:
+            self.resize()
+        _, x, y, _, _ = self.layout
+
+        # Only a shake offset or an overlay can leave stale pixels in the letterbox bars
+        if self.needs_clear or offset != (0, 0) or self.last_offset != (0, 0):
+            self.window.fill((0, 0, 0))
+            self.needs_clear = False
+        self.last_offset = offset
+
+        if self.dest is None:
+            self.window.blit(surf, (x + offset[0], y + offset[1]))
+        else:
+            self._scale_into(surf, self.dest)
+            self.window.blit(self.dest, (x + offset[0], y + offset[1]))
+
+    def present_rects(self, surf, rects):
+        """Copy only `rects` (game space) to the window; returns the window rects.
+
+        Scaling pieces separately would not land on the same pixels as a full
+        scale, so the whole frame is scaled once and only the mapped rects
+        are blitted and reported for display.update().
+        """
+        scale, ox, oy, new_w, new_h = self.layout
+        out = []
+        if self.dest is None:
+            for r in rects:
+                self.window.blit(surf, (ox + r.x, oy + r.y), r)
+                out.append(pygame.Rect(ox + r.x, oy + r.y, r.w, r.h))
+            return out
+        self._scale_into(surf, self.dest)
+        for r in rects:
+            # One extra pixel on each side covers filtering and rounding at the edges
+            x0 = max(0, int(r.x * scale) - 1)
+            y0 = max(0, int(r.y * scale) - 1)
+            x1 = min(new_w, int(math.ceil(r.right * scale)) + 1)
+            y1 = min(new_h, int(math.ceil(r.bottom * scale)) + 1)
+            local = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+            if not local.w or not local.h:
+                continue
+            out.append(self.window.blit(self.dest, (ox + x0, oy + y0), local))
+        return out
+
+
+# ======================================
+# DIRTY RECT RENDERER
+# ======================================
+class DirtyRenderer:
+    """Redraws and presents only the parts of the playfield that changed.
+
+    Sprites are erased and redrawn through the world's RenderUpdates group;
+    effects report the rects they blitted so they can be erased next frame.
+    Only the window rects matching the changed game-space rects are copied
+    and passed to display.update(); above 1x the frame is still scaled whole.
+    """
+
+    def __init__(self):
+        self.full = True
+        self.win_size = None
+        self.effect_rects = []
+        self.stats = {"full": 0, "partial": 0, "rects": 0, "pixels": 0}
+
+    def invalidate(self):
+        """Next frame redraws and presents everything (state change, shake, overlay)."""
+        self.full = True
+
+    def draw_playing(self, surf, bg, group, particles, draw=None):
+        """Draw the playfield; returns changed game-space rects, or None for a full frame.
+
+        `draw(group, surf)` replaces group.draw, e.g. to draw interpolated positions.
+        """
+        if draw is None:
+            draw = type(group).draw
+        if self.full:
+            surf.blit(bg, (0, 0))
+            draw(group, surf)
+            self.effect_rects = particles.draw(surf)
+            return None
+
+        group.clear(surf, bg)
+        for r in self.effect_rects:
+            surf.blit(bg, r, r)
+        dirty = draw(group, surf)
+        new_effects = particles.draw(surf)
+        dirty.extend(self.effect_rects)
+        dirty.extend(new_effects)
+        self.effect_rects = new_effects
+        return dirty
+
+    def present(self, presenter, surf, rects):
+        """Present the changed regions; returns the window rects to update."""
+        if presenter.window.get_size() != presenter.win_size:
+            presenter.resize()
+        if presenter.win_size != self.win_size:
+            self.win_size = presenter.win_size
+            rects = None
+
+        if rects is not None:
+            bounds = surf.get_rect()
+            clipped = [r.inflate(2, 2).clip(bounds) for r in rects]
+            clipped = [r for r in clipped if r.w and r.h]
+            area = sum(r.w * r.h for r in clipped)
+            if area > FULL_PRESENT_RATIO * bounds.w * bounds.h:
+                rects = None
+
+        self.full = False
+        if rects is None:
+            presenter.present(surf)
+            self.stats["full"] += 1
+            return [presenter.window.get_rect()]
+
+        out = presenter.present_rects(surf, clipped)
+        self.stats["partial"] += 1
+        self.stats["rects"] += len(out)
+        self.stats["pixels"] += sum(d.w * d.h for d in out)
+        return out
@@ -0,0 +1,142 @@
+"""Input recordings: write them from the game, replay them headless.
+
+    python covidWarRemaster.py --seed 42 --record run.cwr
+    python replay.py run.cwr
+
+A recording is the world seed plus one InputFrame per simulation tick and
+the checksum of the final state. Replay runs the ticks back to back with no
+window or frame pacing, checks the checksum and reports ticks per second,
+so the same recording is both a bug repro and a fixed CPU workload.
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+
+from controls import InputFrame, PlayControls
+
+MAGIC = b"CWR2"  # 2: button events store the bound action, not the raw button
+END = b"END."
+HEADER = struct.Struct("<4sQI")   # magic, seed, swarm enemies (0 = sprite world)
+TICK = struct.Struct("<hB")       # axis 0 as int16, event count
+EVENT = struct.Struct("<Bb")      # kind, code
+TRAILER = struct.Struct("<4sII")  # end marker, tick count, final checksum
+
+
+# ======================================
+# RECORDER
+# ======================================
+class Recorder:
+    """Appends one InputFrame per tick to an in-memory buffer."""
+
+    def __init__(self, seed, swarm=0):
+        self.seed = seed
+        self.swarm = swarm
+        self.data = bytearray(HEADER.pack(MAGIC, seed, swarm))
+        self.ticks = 0
+
+    def add(self, frame):
+        if len(frame.events) > 255:
+            raise ValueError(f"{len(frame.events)} input events in one tick")
+        self.data += TICK.pack(frame.axis, len(frame.events))
+        for kind, code in frame.events:
+            self.data += EVENT.pack(kind, code)
+        self.ticks += 1
+
+    def save(self, path, checksum):
+        with open(path, "wb") as f:
+            f.write(self.data)
+            f.write(TRAILER.pack(END, self.ticks, checksum))
+
+
+# ======================================
+# RECORDING
+# ======================================
+class Recording:
+    def __init__(self, seed, swarm, frames, checksum):
+        self.seed = seed
+        self.swarm = swarm
+        self.frames = frames
+        self.checksum = checksum
+
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size + TRAILER.size:
+        raise ValueError(f"{path}: too short for a recording")
+    magic, seed, swarm = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a recording (magic {magic!r})")
+    end, ticks, checksum = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+    if end != END:
+        raise ValueError(f"{path}: truncated recording")
+
+    frames = []
+    pos, stop = HEADER.size, len(data) - TRAILER.size
+    while pos < stop:
+        axis, n = TICK.unpack_from(data, pos)
+        pos += TICK.size
+        events = [EVENT.unpack_from(data, pos + i * EVENT.size) for i in range(n)]
+        pos += n * EVENT.size
+        frames.append(InputFrame(events, axis))
+    if len(frames) != ticks:
+        raise ValueError(f"{path}: {len(frames)} ticks, trailer says {ticks}")
+    return Recording(seed, swarm, frames, checksum)
+
+
+# ======================================
+# REPLAY
+# ======================================
+def make_world(rec):
+    if rec.swarm:
+        from swarm import SwarmWorld
+        return SwarmWorld(rec.swarm, seed=rec.seed)
+    from world import World
+    return World(rec.seed)
+
+
+def replay(rec):
+    """Run every recorded tick; returns (world, seconds spent stepping)."""
+    world = make_world(rec)
+    controls = PlayControls()
+    step = world.step
+    apply = controls.apply
+    t0 = time.perf_counter()
+    for frame in rec.frames:
+        step(apply(frame))
+    return world, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a Covid19War input recording headless")
+    parser.add_argument("recording")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times and report the fastest")
+    args = parser.parse_args(argv)
+
+    # Set here, not at import: the game imports this module for Recorder
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+
+    rec = load(args.recording)
+    best = None
+    for i in range(args.repeat):
+        world, seconds = replay(rec)
+        best = seconds if best is None else min(best, seconds)
+    got = world.checksum()
+
+    ticks = len(rec.frames)
+    print(f"{args.recording}: seed {rec.seed}, {ticks} ticks, score {world.player.score}")
+    print(f"replayed in {best * 1000:.1f} ms ({ticks / best if best else 0:.0f} ticks/s)")
+    if got != rec.checksum:
+        print(f"checksum MISMATCH: recorded {rec.checksum:08x}, replayed {got:08x}")
+        return 1
+    print(f"checksum OK {got:08x}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
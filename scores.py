@@ -0,0 +1,208 @@
+"""Persistent leaderboard and per-run statistics.
+
+Two files share a stem:
+
+    STEM.jsonl       append-only journal, one run per line
+    STEM.idx.json    compact index: top runs, totals, last folded sequence
+
+Each run gets a sequence number. Every COMPACT_EVERY runs the journal is
+folded into the index (written to a temp file and swapped in atomically)
+and truncated, so startup reads the small index plus at most a few
+journal lines no matter how many runs were played. Journal lines already
+in the index are skipped by sequence, so a crash between the index swap
+and the truncate loses nothing and counts nothing twice. An index that
+cannot be read is moved aside to STEM.idx.json.bad and no compaction runs
+for the rest of the session, so the journal is never truncated onto it.
+
+All file work happens on a writer thread fed by a queue; record() only
+updates memory and enqueues.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+SCORES_STEM = "scores"
+TOP_SIZE = 100
+COMPACT_EVERY = 32
+
+
+def run_stats(world, seed=None):
+    """The record for a finished run of `world`."""
+    return {
+        "score": world.player.score,
+        "wave": world.current_wave,
+        "duration": round(world.elapsed, 2),
+        "shots": world.shots_fired,
+        "hits": world.hits,
+        "seed": seed,
+        "time": int(time.time()),
+    }
+
+
+def empty_index():
+    return {"seq": 0, "runs": 0, "top": [], "totals": {"duration": 0.0, "shots": 0, "hits": 0, "best_wave": 0}}
+
+
+# ======================================
+# SCORE STORE
+# ======================================
+class ScoreStore:
+    def __init__(self, stem=SCORES_STEM, top_size=TOP_SIZE, compact_every=COMPACT_EVERY):
+        # Relative stems live next to the game, not wherever it was started from
+        if not os.path.isabs(stem):
+            stem = os.path.join(os.path.dirname(os.path.abspath(__file__)), stem)
+        self.log_path = stem + ".jsonl"
+        self.index_path = stem + ".idx.json"
+        self.top_size = top_size
+        self.compact_every = compact_every
+        self.index = empty_index()
+        self.pending = 0  # journal lines not yet folded into the index file
+        self.index_damaged = False  # unreadable index: never compact over it this session
+        self.queue = queue.Queue()
+        self.thread = None
+        self.errors = []
+        self.counts = {"appends": 0, "compactions": 0, "write_ms": 0.0, "max_queue": 0, "load_ms": 0.0}
+
+    # ---------- loading ----------
+    def load(self):
+        """Read the index and any journal tail it does not cover, then start the writer."""
+        start = time.perf_counter()
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            if not isinstance(index, dict) or not set(empty_index()) <= set(index):
+                raise ValueError("not a score index")
+            self.index = index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            # The journal only holds runs since the last compaction; folding it over an empty
+            # index would drop the top list and totals for good, so keep the damaged file
+            self.errors.append(f"index {self.index_path}: {e}")
+            self.index_damaged = True
+            try:
+                os.replace(self.index_path, self.index_path + ".bad")
+            except OSError as e:
+                self.errors.append(f"index {self.index_path}: {e}")
+        try:
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        run = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    if run.get("seq", 0) > self.index["seq"]:
+                        self._fold(run)
+                        self.pending += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.errors.append(f"journal {self.log_path}: {e}")
+        self.counts["load_ms"] = (time.perf_counter() - start) * 1000
+        self.start()
+        return self
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._writer, name="score-writer", daemon=True)
+            self.thread.start()
+
+    # ---------- queries ----------
+    @property
+    def best(self):
+        top = self.index["top"]
+        return top[0]["score"] if top else 0
+
+    def top(self, n=10):
+        return self.index["top"][:n]
+
+    @property
+    def runs(self):
+        return self.index["runs"]
+
+    # ---------- writes ----------
+    def _fold(self, run):
+        index = self.index
+        index["seq"] = max(index["seq"], run["seq"])
+        index["runs"] += 1
+        totals = index["totals"]
+        totals["duration"] += run["duration"]
+        totals["shots"] += run["shots"]
+        totals["hits"] += run["hits"]
+        totals["best_wave"] = max(totals["best_wave"], run["wave"])
+        top = index["top"]
+        if len(top) < self.top_size or run["score"] > top[-1]["score"]:
+            # Ties keep the earlier run first
+            i = len(top)
+            while i and top[i - 1]["score"] < run["score"]:
+                i -= 1
+            top.insert(i, run)
+            del top[self.top_size:]
+
+    def record(self, run):
+        """Add a finished run; returns at once, the disk write happens on the writer thread."""
+        run = dict(run, seq=self.index["seq"] + 1)
+        self._fold(run)
+        self.pending += 1
+        self.queue.put(("append", run))
+        if self.pending >= self.compact_every:
+            self.compact()
+        self.counts["max_queue"] = max(self.counts["max_queue"], self.queue.qsize())
+
+    def compact(self):
+        """Queue a fold of the journal into the index; the snapshot is taken now, on this thread."""
+        if self.index_damaged:
+            return  # the journal keeps every run until the index is repaired
+        self.pending = 0
+        self.queue.put(("compact", json.loads(json.dumps(self.index))))
+
+    def close(self):
+        """Flush everything queued and stop the writer."""
+        if self.thread is None:
+            return
+        self.queue.put(("stop", None))
+        self.thread.join()
+        self.thread = None
+
+    # ---------- writer thread ----------
+    def _writer(self):
+        while True:
+            kind, data = self.queue.get()
+            if kind == "stop":
+                return
+            start = time.perf_counter()
+            try:
+                if kind == "append":
+                    self._append(data)
+                else:
+                    self._write_index(data)
+            except OSError as e:
+                self.errors.append(f"{kind}: {e}")
+            self.counts["write_ms"] += (time.perf_counter() - start) * 1000
+
+    def _append(self, run):
+        line = (json.dumps(run) + "\n").encode()
+        with open(self.log_path, "ab+") as f:
+            # A crash can leave a torn last line; start on a fresh one so this run is readable
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        self.counts["appends"] += 1
+
+    def _write_index(self, index):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.index_path)
+        # Everything in the journal is now in the index; lines appended later have higher seq
+        with open(self.log_path, "w"):
+            pass
+        self.counts["compactions"] += 1
+
+    def stats(self):
+        return dict(self.counts, runs=self.runs, pending=self.pending, index_damaged=self.index_damaged,
+                    errors=self.errors)
@@ -0,0 +1,90 @@
+SPATIAL_CELL = 64  # one enemy sprite wide
+
+
+# ======================================
+# SPATIAL HASH
+# ======================================
+class SpatialHash:
+    """Uniform grid broadphase keyed by the cell of each item's center.
+
+    Every item lives in exactly one bucket, so a query never returns
+    duplicates; instead the query rect is widened by the largest half size
+    inserted so far, which still finds every item that could overlap it.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL):
+        self.cell = cell_size
+        self.buckets = {}
+        self.half_w = 0
+        self.half_h = 0
+        self.count = 0
+
+    def clear(self):
+        self.buckets.clear()
+        self.half_w = 0
+        self.half_h = 0
+        self.count = 0
+
+    def insert(self, item, rect):
+        cell = self.cell
+        cx, cy = rect.center
+        key = (cy // cell) * 65536 + cx // cell
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [item]
+        else:
+            bucket.append(item)
+        if rect.w > self.half_w * 2:
+            self.half_w = (rect.w + 1) // 2
+        if rect.h > self.half_h * 2:
+            self.half_h = (rect.h + 1) // 2
+        self.count += 1
+
+    def rebuild(self, sprites):
+        """Rebuild from scratch; cheaper than tracking moves when everything moves."""
+        self.clear()
+        for s in sprites:
+            self.insert(s, s.rect)
+
+    def query(self, rect):
+        """Items whose rect may overlap `rect` (the narrow phase decides)."""
+        cell = self.cell
+        buckets = self.buckets
+        x0 = (rect.left - self.half_w) // cell
+        x1 = (rect.right + self.half_w) // cell
+        y0 = (rect.top - self.half_h) // cell
+        y1 = (rect.bottom + self.half_h) // cell
+        found = []
+        for cy in range(y0, y1 + 1):
+            row = cy * 65536
+            for cx in range(x0, x1 + 1):
+                bucket = buckets.get(row + cx)
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+
+def collide_groups(grid, groupa, groupb, dokilla, dokillb, collided=None):
+    """Drop-in for pygame.sprite.groupcollide with `groupb` bucketed in `grid`.
+
+    Same result and kill order as groupcollide: sprites of `groupa` are
+    visited in group order and a `groupb` sprite killed by an earlier hit
+    cannot be hit again.
+    """
+    grid.rebuild(groupb)
+    crashed = {}
+    for a in groupa.sprites():
+        arect = a.rect
+        hits = []
+        for b in grid.query(arect):
+            if not b.alive():
+                continue
+            if arect.colliderect(b.rect) if collided is None else collided(a, b):
+                hits.append(b)
+                if dokillb:
+                    b.kill()
+        if hits:
+            crashed[a] = hits
+            if dokilla:
+                a.kill()
+    return crashed
@@ -0,0 +1,296 @@
+"""Struct-of-arrays backend for the swarm/stress mode.
+
+Enemies and bullets are rows in NumPy arrays instead of Sprite objects, so
+movement, respawn, off-screen culling and AABB overlap run as a handful of
+batched array operations per tick no matter how many entities there are.
+The player stays a regular sprite. NumPy is only needed for this mode.
+"""
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # the regular game does not need numpy
+    np = None
+
+from assets import assets
+from config import BASE_WIDTH, BASE_HEIGHT, FPS
+from waves import get_default_schedule, SPAWN
+from world import (
+    Player, StatsPublisher, NO_INPUT, CURE_SPIN_STEP, make_fallback_covid, make_fallback_cure,
+    EVENT_KILL, EVENT_PLAYER_HIT, EVENT_WAVE, EVENT_GAMEOVER,
+)
+
+SWARM_ENEMIES = 10000
+MAX_BULLETS = 1024
+BULLET_SPEED = -8
+
+
+# ======================================
+# DRAW LAYER
+# ======================================
+class SwarmLayer:
+    """Stands in for World.allsprites so front-ends can call draw(surf)."""
+
+    def __init__(self, world):
+        self.world = world
+
+    def draw(self, surf):
+        w = self.world
+        n, nb = w.enemy_count, w.bullet_count
+        img = w.enemy_image
+        # Rows still above the screen cost nothing to skip here
+        visible = w.ey[:n] > -w.eh
+        batch = [(img, xy) for xy in zip(w.ex[:n][visible].tolist(), w.ey[:n][visible].tolist())]
+        frames = w.frames.images
+        batch.extend(
+            (frames[f], xy)
+            for f, xy in zip(w.bframe[:nb].tolist(), zip(w.bx[:nb].tolist(), w.by[:nb].tolist()))
+        )
+        batch.append((w.player.image, w.player.rect))
+        surf.blits(batch, doreturn=False)
+        return []
+
+    def __len__(self):
+        return self.world.enemy_count + self.world.bullet_count + 1
+
+
+# ======================================
+# SWARM WORLD
+# ======================================
+class SwarmWorld(StatsPublisher):
+    """Same rules and step() contract as World, with enemies and bullets in arrays."""
+
+    def __init__(self, enemies=SWARM_ENEMIES, seed=None, waves=None):
+        if np is None:
+            raise RuntimeError("swarm mode needs numpy: pip install numpy")
+        self.waves = waves if waves is not None else get_default_schedule()
+        # `enemies` replaces the first wave's tick-0 spawns; later waves come from the timeline
+        self.start_enemies = enemies
+        self.capacity = enemies + self.waves.spawns_after(0)
+        self.rng = np.random.default_rng(seed)
+
+        self.enemy_image = assets.image("covid19.png", fallback=make_fallback_covid)
+        self.ew, self.eh = self.enemy_image.get_size()
+        self.frames = assets.rotations("cure.png", CURE_SPIN_STEP, fallback=make_fallback_cure)
+        offsets = np.array(self.frames.offsets, dtype=np.int32)
+        self.fdx, self.fdy, self.fw, self.fh = offsets.T
+
+        # Enemy rows: top-left and fall speed; rows [0, enemy_count) are live
+        self.ex = np.zeros(self.capacity, np.int32)
+        self.ey = np.zeros(self.capacity, np.int32)
+        self.evy = np.zeros(self.capacity, np.int32)
+        # Per-row fall speed range [lo, hi) from the wave that spawned it
+        self.evlo = np.full(self.capacity, 2, np.int32)
+        self.evhi = np.full(self.capacity, 6, np.int32)
+        # Bullet rows: center, rotation frame; packed, rows [0, bullet_count) are live
+        self.bcx = np.zeros(MAX_BULLETS, np.int32)
+        self.bcy = np.zeros(MAX_BULLETS, np.int32)
+        self.bframe = np.zeros(MAX_BULLETS, np.int32)
+        self.bx = np.zeros(MAX_BULLETS, np.int32)
+        self.by = np.zeros(MAX_BULLETS, np.int32)
+
+        self.allsprites = SwarmLayer(self)
+        self.dropped_shots = 0
+        self.subscribers = []
+        self.published = (None, None, None)
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.player = Player()
+        self.enemy_count = 0
+        self.bullet_count = 0
+        # Speed range of the latest wave to start; killed rows respawn with it, as in World
+        self.wave_speed = self.waves.waves[0].speed
+        self.spawn_enemies(self.start_enemies, self.wave_speed)
+        self.tick = 0
+        self.current_wave = 1
+        self.game_over = False
+        self.events = []
+        # Skip the tick-0 entries: start_enemies stands in for them
+        self.wave_pos, _ = self.waves.due(0, 0)
+        self.shots_fired = 0
+        self.hits = 0
+        self.publish_stats()
+
+    def checksum(self):
+        """CRC32 of the simulation state, same purpose as World.checksum."""
+        p = self.player
+        crc = zlib.crc32(struct.pack("<7i", self.tick, self.current_wave, self.game_over,
+                                     p.score, p.life, p.hit_cooldown, p.rect.x))
+        n, nb = self.enemy_count, self.bullet_count
+        for arr in (self.ex[:n], self.ey[:n], self.evy[:n], self.bcx[:nb], self.bcy[:nb], self.bframe[:nb]):
+            crc = zlib.crc32(arr.tobytes(), crc)
+        return crc
+
+    @property
+    def elapsed(self):
+        return self.tick / FPS
+
+    # ---------- spawning ----------
+    def respawn(self, idx):
+        """Covid.respawn for every row in `idx` at once."""
+        k = len(idx)
+        self.ex[idx] = self.rng.integers(0, BASE_WIDTH - self.ew, k)
+        self.ey[idx] = self.rng.integers(-100, -40, k)
+        self.evy[idx] = self.rng.integers(self.evlo[idx], self.evhi[idx], k)
+
+    def spawn_enemies(self, k, speed_range=(2, 6)):
+        k = min(k, self.capacity - self.enemy_count)
+        idx = np.arange(self.enemy_count, self.enemy_count + k)
+        self.evlo[idx], self.evhi[idx] = speed_range
+        self.respawn(idx)
+        self.enemy_count += k
+
+    def shoot(self):
+        if self.bullet_count >= MAX_BULLETS:
+            self.dropped_shots += 1
+            return
+        i = self.bullet_count
+        # Same start as Cure: centered on the player, bottom at the player's top
+        self.bcx[i] = self.player.rect.centerx
+        self.bcy[i] = self.player.rect.top - self.fh[0] + self.fh[0] // 2
+        self.bframe[i] = 0
+        self.bullet_count += 1
+        self.shots_fired += 1
+        self._place_bullets()
+
+    def _place_bullets(self):
+        nb = self.bullet_count
+        f = self.bframe[:nb]
+        self.bx[:nb] = self.bcx[:nb] + self.fdx[f]
+        self.by[:nb] = self.bcy[:nb] + self.fdy[f]
+
+    def _keep_bullets(self, keep):
+        nb = self.bullet_count
+        k = int(keep.sum())
+        for arr in (self.bcx, self.bcy, self.bframe, self.bx, self.by):
+            arr[:k] = arr[:nb][keep]
+        self.bullet_count = k
+
+    # ---------- tick stages ----------
+    def apply_inputs(self, inputs):
+        self.player.speedx = inputs.speedx
+        for _ in range(inputs.shots):
+            self.shoot()
+
+    def update_sprites(self):
+        self.player.update()
+
+        n = self.enemy_count
+        ey = self.ey[:n]
+        ey += self.evy[:n]
+        off = np.flatnonzero(ey > BASE_HEIGHT)
+        if len(off):
+            self.respawn(off)
+
+        nb = self.bullet_count
+        if nb:
+            self.bcy[:nb] += BULLET_SPEED
+            self.bframe[:nb] = (self.bframe[:nb] + 1) % len(self.frames.images)
+            self._place_bullets()
+            bottom = self.by[:nb] + self.fh[self.bframe[:nb]]
+            if (bottom < 0).any():
+                self._keep_bullets(bottom >= 0)
+
+    def collide_bullets(self):
+        nb, n = self.bullet_count, self.enemy_count
+        if not nb or not n:
+            return
+        ex, ey = self.ex[:n], self.ey[:n]
+        f = self.bframe[:nb]
+        bl, bt = self.bx[:nb], self.by[:nb]
+        br, bb = bl + self.fw[f], bt + self.fh[f]
+
+        # Broadphase: enemies sorted by x, each bullet gets the slice that can reach it
+        order = np.argsort(ex, kind="stable")
+        xs = ex[order]
+        lo = np.searchsorted(xs, bl - self.ew, side="right")
+        hi = np.searchsorted(xs, br, side="left")
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        if not total:
+            return
+        pair_b = np.repeat(np.arange(nb), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        pair_e = order[starts + np.arange(total)]
+
+        # Narrow phase on y
+        hit = (ey[pair_e] < bb[pair_b]) & (ey[pair_e] + self.eh > bt[pair_b])
+        if not hit.any():
+            return
+        pair_b, pair_e = pair_b[hit], pair_e[hit]
+
+        # Like groupcollide: each bullet is claimed by the first enemy (row order) it touches
+        first = np.lexsort((pair_e, pair_b))
+        pair_b, pair_e = pair_b[first], pair_e[first]
+        claim = np.ones(len(pair_b), bool)
+        claim[1:] = pair_b[1:] != pair_b[:-1]
+        killed = np.unique(pair_e[claim])
+
+        for x, y in zip((ex[killed] + self.ew // 2).tolist(), (ey[killed] + self.eh // 2).tolist()):
+            self.events.append((EVENT_KILL, (x, y)))
+        self.player.score += 100 * len(killed)
+        self.hits += len(killed)
+
+        # Killed enemies are replaced by fresh ones at the active wave's speed, as World does
+        self.evlo[killed], self.evhi[killed] = self.wave_speed
+        self.respawn(killed)
+        keep = np.ones(nb, bool)
+        keep[pair_b] = False
+        self._keep_bullets(keep)
+
+    def collide_player(self):
+        player = self.player
+        if player.hit_cooldown != 0:
+            return
+        r = player.rect
+        n = self.enemy_count
+        ex, ey = self.ex[:n], self.ey[:n]
+        touching = (ex < r.right) & (ex + self.ew > r.left) & (ey < r.bottom) & (ey + self.eh > r.top)
+        if touching.any():
+            player.life -= 10
+            player.hit_cooldown = 60
+            self.events.append((EVENT_PLAYER_HIT, r.center))
+
+            if player.life <= 0:
+                self.game_over = True
+                self.events.append((EVENT_GAMEOVER, player.score))
+
+    def advance_waves(self):
+        # Rows are preallocated, so unlike World there is nothing to pre-warm
+        self.wave_pos, due = self.waves.due(self.wave_pos, self.tick)
+        for kind, wave in due:
+            if kind == SPAWN:
+                self.spawn_enemies(1, wave.speed)
+                continue
+            self.wave_speed = wave.speed
+            if wave.number != self.current_wave:
+                self.current_wave = wave.number
+                self.events.append((EVENT_WAVE, wave.number))
+
+    def step(self, inputs=NO_INPUT, mark=None):
+        """Advance one tick and return the list of events it produced."""
+        self.events = []
+        if self.game_over:
+            return self.events
+
+        self.apply_inputs(inputs)
+        self.update_sprites()
+        if mark:
+            mark("update")
+        self.collide_bullets()
+        if mark:
+            mark("collide_bullets")
+        self.collide_player()
+        if mark:
+            mark("collide_player")
+        if not self.game_over:
+            self.advance_waves()
+        if mark:
+            mark("waves")
+        self.tick += 1
+        self.publish_stats()
+        return self.events
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+import pygame
+
+from assets import assets
+
+TEXT_CACHE_LIMIT = 256
+OUTLINE_OFFSETS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+# ======================================
+# RENDERED TEXT CACHE
+# ======================================
+class TextCache:
+    """LRU of rendered text surfaces keyed by (text, font, color, outline)."""
+
+    def __init__(self, registry=assets, limit=TEXT_CACHE_LIMIT):
+        self.registry = registry
+        self.limit = limit
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size, color, family="arial", bold=True, outline=None):
+        """Shared surface for `text`; with `outline` the 1px diagonal outline is baked in."""
+        key = (text, family, size, bold, tuple(color), outline)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        f = self.registry.font(family, size, bold)
+        surf = f.render(text, True, color)
+        if outline is not None:
+            shadow = f.render(text, True, outline)
+            w, h = surf.get_size()
+            framed = pygame.Surface((w + 2, h + 2), pygame.SRCALPHA)
+            for dx, dy in OUTLINE_OFFSETS:
+                framed.blit(shadow, (1 + dx, 1 + dy))
+            framed.blit(surf, (1, 1))
+            surf = framed
+
+        self.entries[key] = surf
+        if len(self.entries) > self.limit:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+text_cache = TextCache()
@@ -0,0 +1,94 @@
+from config import FPS
+
+# A frame that owes more steps than this drops the rest instead of spiralling
+MAX_CATCHUP_STEPS = 5
+
+# Moves longer than this between two ticks are respawns, not motion
+TELEPORT_DISTANCE = 64
+
+
+# ======================================
+# FIXED TIMESTEP
+# ======================================
+class FixedTimestep:
+    """Accumulates real time and hands out whole simulation ticks.
+
+    The simulation always advances in 1/hz second steps, so game speed no
+    longer depends on how long a frame took. `alpha` is how far the render
+    time is between the last two ticks, for interpolation.
+    """
+
+    def __init__(self, hz=FPS, max_steps=MAX_CATCHUP_STEPS):
+        self.dt = 1.0 / hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0
+        self.capped_frames = 0
+        self.dropped_time = 0.0
+
+    def reset(self):
+        """Forget owed time (after a pause or a menu) so play resumes without a burst."""
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add `frame_time` seconds; returns how many ticks to run this frame."""
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            dropped = (steps - self.max_steps) * self.dt
+            self.accumulator -= dropped
+            self.dropped_time += dropped
+            self.capped_frames += 1
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self):
+        return min(1.0, self.accumulator / self.dt)
+
+    def stats(self):
+        return {"steps": self.steps, "capped_frames": self.capped_frames,
+                "dropped_ms": round(self.dropped_time * 1000, 1)}
+
+
+# ======================================
+# SPRITE INTERPOLATION
+# ======================================
+class Interpolator:
+    """Draws sprites between their previous and current tick positions.
+
+    capture() records where every sprite was before a tick; draw() moves
+    rects to the blended position, draws the group and puts them back, so
+    the simulation never sees a render-only position.
+    """
+
+    def __init__(self):
+        self.prev = {}
+
+    def clear(self):
+        self.prev = {}
+
+    def capture(self, group):
+        self.prev = {s: s.rect.topleft for s in group.sprites()}
+
+    def draw(self, group, surf, alpha):
+        prev = self.prev
+        moved = []
+        if alpha < 1.0:
+            for s in group.sprites():
+                old = prev.get(s)
+                if old is None:
+                    continue
+                rect = s.rect
+                x, y = rect.topleft
+                dx, dy = x - old[0], y - old[1]
+                if (dx or dy) and abs(dx) < TELEPORT_DISTANCE and abs(dy) < TELEPORT_DISTANCE:
+                    # alpha 0 is the previous tick, 1 the current one
+                    rect.topleft = (round(old[0] + dx * alpha), round(old[1] + dy * alpha))
+                    moved.append((rect, x, y))
+        dirty = group.draw(surf)
+        for rect, x, y in moved:
+            rect.topleft = (x, y)
+        return dirty
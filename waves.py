@@ -0,0 +1,151 @@
+import json
+import os
+
+from config import FPS, GAME_DURATION, MAX_WAVES, WAVE_LENGTH
+
+WAVES_FILE = "waves.json"
+
+# Enemy types a wave may name; worlds map each to a pool or spawner
+ENEMY_TYPES = ("covid",)
+
+PREWARM_LEAD = 2.0   # seconds before a wave starts to begin building its enemies
+PREWARM_PER_TICK = 4  # enemies built per tick while pre-warming
+
+# Timeline entry kinds
+WAVE_START = 0
+SPAWN = 1
+
+# Same waves as the original hard-coded rules: 6 enemies, then 3 + n every 2 minutes
+DEFAULT_WAVES = {
+    "prewarm": PREWARM_LEAD,
+    "waves": [{"start": 0, "count": 6, "speed": [2, 6], "every": 0, "enemy": "covid"}] + [
+        {"start": (n - 1) * WAVE_LENGTH, "count": 3 + n, "speed": [2, 6], "every": 0.5, "enemy": "covid"}
+        for n in range(2, MAX_WAVES + 1)
+    ],
+}
+
+
+# ======================================
+# WAVE DEFINITIONS
+# ======================================
+class Wave:
+    """One wave: `count` enemies of type `enemy`, one every `every` seconds from `start`."""
+
+    __slots__ = ("number", "start", "count", "speed", "every", "enemy")
+
+    def __init__(self, number, start, count, speed=(2, 6), every=0, enemy="covid"):
+        self.number = number
+        self.start = start
+        self.count = count
+        self.speed = tuple(speed)
+        self.every = every
+        self.enemy = enemy
+
+
+def parse_waves(data):
+    """Wave list from {"waves": [...]}; raises ValueError on a bad definition."""
+    waves = []
+    for number, w in enumerate(data.get("waves", ()), 1):
+        try:
+            wave = Wave(number, w["start"], w["count"], w.get("speed", (2, 6)), w.get("every", 0),
+                        w.get("enemy", "covid"))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"wave {number}: missing or bad field {e}") from None
+        lo, hi = wave.speed
+        if wave.enemy not in ENEMY_TYPES:
+            raise ValueError(f"wave {number}: unknown enemy {wave.enemy!r}, have {list(ENEMY_TYPES)}")
+        if not 0 <= wave.start < GAME_DURATION:
+            raise ValueError(f"wave {number}: start {wave.start} outside the {GAME_DURATION} s game")
+        if waves and wave.start <= waves[-1].start:
+            raise ValueError(f"wave {number}: starts must increase")
+        if wave.count < 0 or wave.every < 0 or not 0 < lo < hi:
+            raise ValueError(f"wave {number}: count, every and speed [lo, hi) must be positive")
+        waves.append(wave)
+    if not waves or waves[0].start != 0:
+        raise ValueError("the first wave must start at 0")
+    # The HUD and the env observation count waves out of MAX_WAVES
+    if len(waves) > MAX_WAVES:
+        raise ValueError(f"{len(waves)} waves, at most {MAX_WAVES} are supported")
+    return waves
+
+
+def load_waves(path=WAVES_FILE):
+    """Schedule for a wave file; DEFAULT_WAVES when the file does not exist."""
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = DEFAULT_WAVES
+    return WaveSchedule(parse_waves(data), data.get("prewarm", PREWARM_LEAD))
+
+
+# ======================================
+# SCHEDULE
+# ======================================
+class WaveSchedule:
+    """Wave definitions compiled into a tick-ordered timeline.
+
+    Every wave becomes a WAVE_START entry followed by one SPAWN entry per
+    enemy, spaced `every` seconds apart, so a wave trickles in instead of
+    landing in one frame. Each wave after the first also gets a pre-warm
+    window ending at its start: prewarm_at() names the wave whose enemies
+    should be built ahead of time during that window. The schedule itself
+    is immutable; worlds keep their own position in it.
+    """
+
+    def __init__(self, waves, prewarm=PREWARM_LEAD, fps=FPS):
+        self.waves = waves
+        entries = []
+        for wave in waves:
+            start = int(round(wave.start * fps))
+            entries.append((start, WAVE_START, wave))
+            step = int(round(wave.every * fps))
+            for i in range(wave.count):
+                entries.append((start + i * step, SPAWN, wave))
+        # Stable sort keeps each wave's start ahead of its spawns on the same tick
+        entries.sort(key=lambda e: e[0])
+        self.ticks = [e[0] for e in entries]
+        self.entries = [(kind, wave) for _, kind, wave in entries]
+
+        lead = int(round(prewarm * fps))
+        self.prewarm_windows = [(max(0, int(round(w.start * fps)) - lead), int(round(w.start * fps)), w)
+                                for w in waves[1:]]
+
+    def __len__(self):
+        return len(self.waves)
+
+    def due(self, pos, tick):
+        """Entries up to and including `tick` from position `pos`: (new_pos, entries)."""
+        ticks = self.ticks
+        if pos == len(ticks) or ticks[pos] > tick:
+            return pos, ()
+        end = pos
+        while end < len(ticks) and ticks[end] <= tick:
+            end += 1
+        return end, self.entries[pos:end]
+
+    def prewarm_at(self, tick):
+        """The wave to pre-warm for at `tick`, or None."""
+        for start, end, wave in self.prewarm_windows:
+            if start <= tick < end:
+                return wave
+            if tick < start:
+                break
+        return None
+
+    def spawns_after(self, tick):
+        """How many enemies the timeline spawns after `tick` (to size fixed arrays)."""
+        return sum(1 for t, (kind, _) in zip(self.ticks, self.entries) if kind == SPAWN and t > tick)
+
+
+default_schedule = None
+
+
+def get_default_schedule():
+    """waves.json, loaded once per process."""
+    global default_schedule
+    if default_schedule is None:
+        default_schedule = load_waves()
+    return default_schedule
@@ -0,0 +1,383 @@
+import random
+import struct
+import zlib
+
+import pygame
+
+from assets import assets
+from config import BASE_WIDTH, BASE_HEIGHT, FPS
+from pools import Pool
+from spatial import SpatialHash, collide_groups
+from waves import get_default_schedule, PREWARM_PER_TICK, SPAWN
+
+# Events reported by World.step for the front-end (sound, effects, shake)
+EVENT_KILL = "kill"
+EVENT_PLAYER_HIT = "player_hit"
+EVENT_WAVE = "wave"
+EVENT_GAMEOVER = "gameover"
+
+PLAYER_SPEED = 6
+
+# Pooled sprites beyond these counts are still built, but counted as overflow
+COVID_POOL_SIZE = 128
+CURE_POOL_SIZE = 256
+
+
+# ======================================
+# PLAYER
+# ======================================
+def make_fallback_player():
+    img = pygame.Surface((40, 60), pygame.SRCALPHA)
+    pygame.draw.polygon(img, (0, 255, 255), [(20, 0), (0, 60), (40, 60)])
+    return img
+
+
+class Player(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        # Shared surfaces: idle, moving left, moving right
+        self.images = [
+            assets.image("JiJiSR1.png", fallback=make_fallback_player),
+            assets.image("JiJiSR1L.png", fallback=make_fallback_player),
+            assets.image("JiJiSR1R.png", fallback=make_fallback_player),
+        ]
+
+        self.image = self.images[0]
+        self.rect = self.image.get_rect(midbottom=(BASE_WIDTH // 2, BASE_HEIGHT - 40))
+        self.speedx = 0
+        self.life = 100
+        self.score = 0
+        self.hit_cooldown = 0
+
+    def update(self):
+        self.rect.x += self.speedx
+        self.rect.clamp_ip(pygame.Rect(0, 0, BASE_WIDTH, BASE_HEIGHT))
+
+        if self.speedx < 0:
+            self.image = self.images[1]
+        elif self.speedx > 0:
+            self.image = self.images[2]
+        else:
+            self.image = self.images[0]
+
+        if self.hit_cooldown > 0:
+            self.hit_cooldown -= 1
+
+
+# ======================================
+# ENEMY
+# ======================================
+def make_fallback_covid():
+    img = pygame.Surface((30, 30), pygame.SRCALPHA)
+    pygame.draw.circle(img, (255, 50, 50), (15, 15), 15)
+    return img
+
+
+class Covid(pygame.sprite.Sprite):
+    def __init__(self, pool=None, rng=None):
+        super().__init__()
+        self.pool = pool
+        # World sprites draw from the world's seeded RNG so runs can be replayed
+        self.rng = random if rng is None else rng
+        self.image = assets.image("covid19.png", fallback=make_fallback_covid)
+        self.rect = self.image.get_rect()
+        self.speedy = 0
+        self.speed_range = (2, 6)  # set per wave by World.spawn_covid
+        if pool is None:
+            self.respawn()
+
+    def kill(self):
+        # Back to the free list instead of the garbage collector
+        if self.pool is not None and self.alive():
+            super().kill()
+            self.pool.release(self)
+        else:
+            super().kill()
+
+    def respawn(self):
+        rng = self.rng
+        self.rect.x = rng.randrange(BASE_WIDTH - self.rect.width)
+        self.rect.y = rng.randrange(-100, -40)
+        self.speedy = rng.randrange(*self.speed_range)
+
+    def update(self):
+        self.rect.y += self.speedy
+        if self.rect.top > BASE_HEIGHT:
+            self.respawn()
+
+
+# ======================================
+# BULLET
+# ======================================
+def make_fallback_cure():
+    img = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(img, (0, 255, 0), (10, 10), 10)
+    return img
+
+
+CURE_SPIN_STEP = 15
+
+
+class Cure(pygame.sprite.Sprite):
+    def __init__(self, x=0, y=0, pool=None):
+        super().__init__()
+        self.pool = pool
+        # All bullets share one table of pre-rotated frames
+        self.frames = assets.rotations("cure.png", CURE_SPIN_STEP, fallback=make_fallback_cure)
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.image = self.frames.images[0]
+        self.mask = self.frames.masks[0]
+        self.rect = self.image.get_rect(centerx=x, bottom=y)
+        self.speedy = -8
+        self.rot = 0
+
+    def kill(self):
+        if self.pool is not None and self.alive():
+            super().kill()
+            self.pool.release(self)
+        else:
+            super().kill()
+
+    def update(self):
+        self.rect.y += self.speedy
+        self.rot = (self.rot + CURE_SPIN_STEP) % 360
+
+        i = self.frames.index(self.rot)
+        self.image = self.frames.images[i]
+        self.mask = self.frames.masks[i]
+
+        # Keep it centered (rotation changes size)
+        cx, cy = self.rect.center
+        dx, dy, w, h = self.frames.offsets[i]
+        self.rect.update(cx + dx, cy + dy, w, h)
+
+        if self.rect.bottom < 0:
+            self.kill()
+
+
+# ======================================
+# INPUTS
+# ======================================
+class Inputs:
+    """What the player asked for during one tick."""
+
+    __slots__ = ("speedx", "shots")
+
+    def __init__(self, speedx=0, shots=0):
+        self.speedx = speedx
+        self.shots = shots
+
+
+NO_INPUT = Inputs()
+
+
+# ======================================
+# STAT CHANGES
+# ======================================
+class StatsPublisher:
+    """Mixin for worlds: tells subscribers when score, life or wave change.
+
+    Values are compared once per tick, so a HUD hears about a kill or a hit
+    without polling every frame. Subscribers are called as fn(name, value).
+    """
+
+    STAT_NAMES = ("score", "life", "wave")
+
+    def subscribe(self, fn):
+        """Register fn and send it every current value right away."""
+        self.subscribers.append(fn)
+        for name, value in zip(self.STAT_NAMES, self.published):
+            fn(name, value)
+
+    def publish_stats(self):
+        current = (self.player.score, self.player.life, self.current_wave)
+        if current == self.published:
+            return
+        for name, old, new in zip(self.STAT_NAMES, self.published, current):
+            if old != new:
+                for fn in self.subscribers:
+                    fn(name, new)
+        self.published = current
+
+
+# ======================================
+# WORLD
+# ======================================
+class World(StatsPublisher):
+    """The whole simulation: no window, no audio, no event queue.
+
+    Front-ends feed one Inputs per tick to step() and react to the events it
+    returns (play a sound, spawn an explosion, shake the screen).
+    """
+
+    def __init__(self, seed=None, broadphase=True, waves=None):
+        # Wave timeline from waves.json unless a schedule is passed in
+        self.waves = waves if waves is not None else get_default_schedule()
+        # Everything random in the simulation comes from here, never the global module
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Bucket bullets in a grid instead of testing every enemy against every bullet
+        self.grid = SpatialHash() if broadphase else None
+        self.covid_pool = Pool(lambda: Covid(self.covid_pool, self.rng), COVID_POOL_SIZE, overflow=True)
+        self.cure_pool = Pool(lambda: Cure(pool=self.cure_pool), CURE_POOL_SIZE, overflow=True)
+        self.allsprites = None
+        self.subscribers = []
+        self.published = (None, None, None)
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a new run; with `seed` the run is reproducible tick for tick."""
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+
+        # Hand every pooled sprite of the previous run back before dropping the groups
+        if self.allsprites is not None:
+            for s in self.allsprites.sprites():
+                s.kill()
+
+        # RenderUpdates so dirty-rect front-ends can erase and report what moved
+        self.allsprites = pygame.sprite.RenderUpdates()
+        self.covids = pygame.sprite.Group()
+        self.cures = pygame.sprite.Group()
+
+        self.player = Player()
+        self.allsprites.add(self.player)
+
+        self.tick = 0
+        self.current_wave = 1
+        # Speed range of the latest wave to start; enemies killed and replaced take it too
+        self.wave_speed = (2, 6)
+        self.game_over = False
+        self.events = []
+        # First wave's tick-0 enemies are there before the first step
+        self.wave_pos = 0
+        self.run_waves()
+        # Run statistics for the score store
+        self.shots_fired = 0
+        self.hits = 0
+        self.publish_stats()
+
+    @property
+    def elapsed(self):
+        """Seconds of game time since reset; stops while the game is not stepped."""
+        return self.tick / FPS
+
+    def checksum(self):
+        """CRC32 of the simulation state, for comparing a replay with its recording."""
+        p = self.player
+        crc = zlib.crc32(struct.pack("<7i", self.tick, self.current_wave, self.game_over,
+                                     p.score, p.life, p.hit_cooldown, p.rect.x))
+        for group in (self.covids, self.cures):
+            state = []
+            for s in group:
+                state.extend((s.rect.x, s.rect.y, s.rect.w, s.rect.h, s.speedy))
+            crc = zlib.crc32(struct.pack(f"<{len(state)}i", *state), crc)
+        return crc
+
+    def pool_stats(self):
+        return {"covid": self.covid_pool.stats(), "cure": self.cure_pool.stats()}
+
+    def spawn_covid(self, speed_range=(2, 6)):
+        c = self.covid_pool.acquire()
+        c.speed_range = speed_range
+        c.respawn()
+        self.allsprites.add(c)
+        self.covids.add(c)
+        return c
+
+    def shoot(self):
+        b = self.cure_pool.acquire()
+        b.reset(self.player.rect.centerx, self.player.rect.top)
+        self.allsprites.add(b)
+        self.cures.add(b)
+        self.shots_fired += 1
+        return b
+
+    # ---------- tick stages ----------
+    def apply_inputs(self, inputs):
+        self.player.speedx = inputs.speedx
+        for _ in range(inputs.shots):
+            self.shoot()
+
+    def update_sprites(self):
+        self.allsprites.update()
+
+    def collide_bullets(self):
+        # Collision: bullets hit enemies
+        if self.grid is not None:
+            hits = collide_groups(self.grid, self.covids, self.cures, True, True)
+        else:
+            hits = pygame.sprite.groupcollide(self.covids, self.cures, True, True)
+        # Read positions first: a respawn below may reuse a killed sprite
+        for center in [h.rect.center for h in hits]:
+            self.player.score += 100
+            self.hits += 1
+            self.events.append((EVENT_KILL, center))
+
+            # Spawn new enemy
+            self.spawn_covid(self.wave_speed)
+
+    def collide_player(self):
+        # Collision: enemies hit player (a single query; a linear scan beats building a grid)
+        player = self.player
+        hits = pygame.sprite.spritecollide(player, self.covids, False)
+        if hits and player.hit_cooldown == 0:
+            player.life -= 10
+            player.hit_cooldown = 60
+            self.events.append((EVENT_PLAYER_HIT, player.rect.center))
+
+            if player.life <= 0:
+                self.game_over = True
+                self.events.append((EVENT_GAMEOVER, player.score))
+
+    def run_waves(self):
+        """Apply the wave timeline entries due at this tick; returns True if one ran."""
+        self.wave_pos, due = self.waves.due(self.wave_pos, self.tick)
+        for kind, wave in due:
+            if kind == SPAWN:
+                self.spawn_covid(wave.speed)
+                continue
+            self.wave_speed = wave.speed
+            if wave.number != self.current_wave:
+                self.current_wave = wave.number
+                self.events.append((EVENT_WAVE, wave.number))
+        return bool(due)
+
+    def advance_waves(self):
+        self.run_waves()
+        # Build the next wave's sprites a few per tick before it starts, not all on its first tick
+        upcoming = self.waves.prewarm_at(self.tick)
+        if upcoming is not None:
+            pool = self.covid_pool
+            pool.prewarm(min(upcoming.count, len(pool.free) + PREWARM_PER_TICK))
+
+    def step(self, inputs=NO_INPUT, mark=None):
+        """Advance one tick and return the list of events it produced.
+
+        `mark(stage)` is called after each stage so benchmarks and the
+        profiler can time them without the world knowing about clocks.
+        """
+        self.events = []
+        if self.game_over:
+            return self.events
+
+        self.apply_inputs(inputs)
+        self.update_sprites()
+        if mark:
+            mark("update")
+        self.collide_bullets()
+        if mark:
+            mark("collide_bullets")
+        self.collide_player()
+        if mark:
+            mark("collide_player")
+        if not self.game_over:
+            self.advance_waves()
+        if mark:
+            mark("waves")
+        self.tick += 1
+        self.publish_stats()
+        return self.events